@@ -0,0 +1,80 @@
+from typing import Iterable, Optional, Set, Tuple
+
+# How calendar entries commonly name countries, by ISO code
+COUNTRY_ALIASES = {
+    'us': ('usa', 'united states', 'united states of america', 'america'),
+    'gb': ('uk', 'united kingdom', 'great britain', 'england', 'scotland', 'wales'),
+    'ca': ('canada',), 'mx': ('mexico',), 'ie': ('ireland',), 'fr': ('france',),
+    'de': ('germany', 'deutschland'), 'nl': ('netherlands', 'holland'), 'be': ('belgium',),
+    'es': ('spain', 'espana'), 'pt': ('portugal',), 'it': ('italy', 'italia'),
+    'at': ('austria',), 'ch': ('switzerland',), 'cz': ('czechia', 'czech republic'),
+    'pl': ('poland',), 'dk': ('denmark',), 'se': ('sweden',), 'no': ('norway',),
+    'fi': ('finland',), 'hu': ('hungary',), 'gr': ('greece',), 'tr': ('turkey',),
+    'jp': ('japan',), 'kr': ('south korea', 'korea'), 'sg': ('singapore',),
+    'hk': ('hong kong',), 'th': ('thailand',), 'in': ('india',),
+    'ae': ('uae', 'united arab emirates'), 'au': ('australia',), 'nz': ('new zealand',),
+    'br': ('brazil', 'brasil'), 'ar': ('argentina',), 'cl': ('chile',),
+    'co': ('colombia',), 'pe': ('peru',), 'cr': ('costa rica',)
+}
+
+# Full names of the regions the built-in gazetteer abbreviates
+REGION_NAMES = {
+    'al': 'alabama', 'ak': 'alaska', 'az': 'arizona', 'ar': 'arkansas', 'ca': 'california',
+    'co': 'colorado', 'ct': 'connecticut', 'de': 'delaware', 'dc': 'district of columbia',
+    'fl': 'florida', 'ga': 'georgia', 'hi': 'hawaii', 'id': 'idaho', 'il': 'illinois',
+    'in': 'indiana', 'ia': 'iowa', 'ks': 'kansas', 'ky': 'kentucky', 'la': 'louisiana',
+    'me': 'maine', 'md': 'maryland', 'ma': 'massachusetts', 'mi': 'michigan', 'mn': 'minnesota',
+    'ms': 'mississippi', 'mo': 'missouri', 'mt': 'montana', 'ne': 'nebraska', 'nv': 'nevada',
+    'nh': 'new hampshire', 'nj': 'new jersey', 'nm': 'new mexico', 'ny': 'new york',
+    'nc': 'north carolina', 'nd': 'north dakota', 'oh': 'ohio', 'ok': 'oklahoma', 'or': 'oregon',
+    'pa': 'pennsylvania', 'ri': 'rhode island', 'sc': 'south carolina', 'sd': 'south dakota',
+    'tn': 'tennessee', 'tx': 'texas', 'ut': 'utah', 'vt': 'vermont', 'va': 'virginia',
+    'wa': 'washington', 'wv': 'west virginia', 'wi': 'wisconsin', 'wy': 'wyoming',
+    'ab': 'alberta', 'bc': 'british columbia', 'on': 'ontario', 'qc': 'quebec',
+    'nsw': 'new south wales', 'vic': 'victoria', 'qld': 'queensland'
+}
+# Countries of the regions above that aren't US states
+REGION_COUNTRIES = {'ab': 'ca', 'bc': 'ca', 'on': 'ca', 'qc': 'ca', 'nsw': 'au', 'vic': 'au', 'qld': 'au'}
+
+# Codes and names of every region and country a location may end with
+REGIONS_BY_NAME = {**{code: code for code in REGION_NAMES}, **{name: code for code, name in REGION_NAMES.items()}}
+COUNTRIES_BY_NAME = {**{code: code for code in COUNTRY_ALIASES},
+                     **{alias: code for code, aliases in COUNTRY_ALIASES.items() for alias in aliases}}
+
+def area_name(part: str) -> Optional[str]:
+    """The region or country a normalized location part names, if any.
+
+    A trailing postal code is ignored, so "oh 43017" names Ohio.
+    """
+    words = part.split()
+    while words and any(c.isdigit() for c in words[-1]):
+        words.pop()
+    name = ' '.join(words)
+    return name if name in REGIONS_BY_NAME or name in COUNTRIES_BY_NAME else None
+
+def area_options(names: Iterable[str]) -> Optional[Set[Tuple[Optional[str], str]]]:
+    """Every (region code, country code) that all the area names could mean together.
+
+    The region is None where only the country is named. Codes such as "CA"
+    may mean a region or a country, so there can be several options. None
+    means no names were given.
+    """
+    options = None
+    for name in names:
+        meanings = set()
+        if name in COUNTRIES_BY_NAME:
+            meanings.add((None, COUNTRIES_BY_NAME[name]))
+        if name in REGIONS_BY_NAME:
+            region = REGIONS_BY_NAME[name]
+            meanings.add((region, REGION_COUNTRIES.get(region, 'us')))
+        options = meanings if options is None else combine_areas(options, meanings)
+    return options
+
+def combine_areas(first: Set, second: Set) -> Set:
+    """The options two sets of (region, country) options have in common"""
+    return {
+        (region or other_region, country)
+        for region, country in first
+        for other_region, other_country in second
+        if country == other_country and (region is None or other_region is None or region == other_region)
+    }
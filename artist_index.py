@@ -0,0 +1,50 @@
+import re
+import unicodedata
+from typing import Iterable, Iterator, Optional
+
+LEADING_ARTICLE = re.compile(r'^the\s+')
+
+def artist_key(name: str) -> str:
+    """Canonical key for an artist or performer name.
+
+    Case, accents, a leading "The", "&" or "+" versus "and", spacing and punctuation
+    are ignored, so "The National", "national" and "Beyoncé", "BEYONCE" and
+    "Sigur Rós", "sigur-ros" map to the same keys.
+    """
+    folded = unicodedata.normalize('NFKD', name)
+    folded = ''.join(c for c in folded if not unicodedata.combining(c)).casefold()
+    folded = folded.replace('&', ' and ').replace('+', ' and ').strip()
+    folded = LEADING_ARTICLE.sub('', folded)
+    key = ''.join(c for c in folded if c.isalnum())
+    # Names made only of punctuation (e.g. "!!!") keep their folded text
+    return key or folded
+
+class ArtistIndex:
+    """Spotify artist names keyed by artist_key for single-lookup matching"""
+
+    def __init__(self, artists: Iterable[str]):
+        self.names = []
+        self._by_key = {}
+        for artist in artists:
+            key = artist_key(artist)
+            # The first spelling wins when two artists normalize alike
+            if key not in self._by_key:
+                self._by_key[key] = artist
+                self.names.append(artist)
+
+    @classmethod
+    def of(cls, artists: Iterable[str]) -> 'ArtistIndex':
+        """Reuse an existing index, or build one from a list of names"""
+        return artists if isinstance(artists, cls) else cls(artists)
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """The followed artist a performer name refers to, if any"""
+        if not name:
+            return None
+        return self._by_key.get(artist_key(name))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
@@ -0,0 +1,64 @@
+import time
+from typing import Dict, List, Optional
+
+from json_store import load_json, save_json_atomic
+
+DEFAULT_SNAPSHOT_PATH = 'artists.json'
+DEFAULT_MAX_AGE = 24 * 60 * 60  # seconds
+
+class ArtistSnapshot:
+    """Followed and top Spotify artists saved between runs.
+
+    Each artist is a dict with 'name', 'id', 'followed' and 'top_rank'
+    (best position across the top artist time ranges, or None).
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self.artists = []
+        self.fetched_at = None
+        self.added = []
+        self.removed = []
+        self.load()
+
+    @property
+    def names(self) -> List[str]:
+        return [artist['name'] for artist in self.artists]
+
+    @property
+    def ranked_names(self) -> List[str]:
+        """Names by listening affinity: top artists by best rank, then other follows"""
+        ranked = sorted(
+            (artist for artist in self.artists if artist.get('top_rank') is not None),
+            key=lambda artist: artist['top_rank']
+        )
+        rest = [artist for artist in self.artists if artist.get('top_rank') is None]
+        return [artist['name'] for artist in ranked + rest]
+
+    def load(self):
+        """Load the saved snapshot, starting empty if there is none"""
+        data = load_json(self.path, 'artist snapshot')
+        if data is None:
+            return
+        self.artists = data.get('artists', [])
+        self.fetched_at = data.get('fetched_at')
+
+    def save(self):
+        save_json_atomic(self.path, {'fetched_at': self.fetched_at, 'artists': self.artists})
+
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was fetched from Spotify"""
+        return time.time() - self.fetched_at if self.fetched_at else None
+
+    def is_fresh(self, max_age: int = DEFAULT_MAX_AGE) -> bool:
+        age = self.age()
+        return bool(self.artists) and age is not None and age < max_age
+
+    def update(self, artists: List[Dict]):
+        """Replace the snapshot with freshly fetched artists and record what changed"""
+        old_names = set(self.names)
+        new_names = {artist['name'] for artist in artists}
+        self.added = [artist['name'] for artist in artists if artist['name'] not in old_names]
+        self.removed = [name for name in self.names if name not in new_names]
+        self.artists = artists
+        self.fetched_at = time.time()
@@ -0,0 +1,221 @@
+"""Run Concert Finder for several people at once.
+
+Every person's artists and trips are gathered first, then each distinct
+(artist, city, date window) search is sent to the concert APIs only once
+and the results are handed back to everyone who follows that artist and
+is in that city on that day.
+
+    python batch.py team.json
+    python batch.py team.json --offline --output-dir results
+
+The profiles file lists one entry per person:
+
+    {"users": [
+        {"name": "alex", "home_location": "Chicago, IL, USA"},
+        {"name": "sam", "home_location": "Denver, CO, USA",
+         "spotify_token": "tokens/sam_spotify.json", "calendar_token": "tokens/sam_calendar.pickle"}
+    ]}
+
+Tokens default to files in users/<name>/, where saved artists and calendar
+events are kept too. A person without saved tokens is asked to log in to
+Spotify and Google the first time.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List
+
+from artist_index import ArtistIndex, artist_key
+from concert import Concert
+from concert_finder import ConcertFinder, format_concert_output, write_metrics, write_ndjson
+from search_engine import SearchJob
+from geo import near
+from travel_periods import coalesce_periods, period_day, same_place
+
+API_NAMES = ('seatgeek', 'bandsintown', 'songkick')
+DEFAULT_USERS_DIR = 'users'
+DEFAULT_OUTPUT_DIR = 'batch_results'
+
+class UserProfile:
+    """One person's home, login tokens and saved data folder"""
+
+    def __init__(self, name: str, home_location: str, spotify_token: str = None,
+                 calendar_token: str = None, data_dir: str = None):
+        self.name = name
+        self.home_location = home_location
+        self.data_dir = data_dir or os.path.join(DEFAULT_USERS_DIR, name)
+        self.spotify_token = spotify_token or os.path.join(self.data_dir, 'spotify_token.json')
+        self.calendar_token = calendar_token or os.path.join(self.data_dir, 'calendar_token.pickle')
+        self.artists = []
+        self.artist_keys = set()
+        self.periods = []
+
+def load_profiles(path: str) -> List[UserProfile]:
+    """Read user profiles from a JSON file"""
+    with open(path) as f:
+        data = json.load(f)
+    entries = data.get('users', []) if isinstance(data, dict) else data
+
+    profiles = []
+    for entry in entries:
+        if not entry.get('name') or not entry.get('home_location'):
+            raise ValueError(f"Every user in {path} needs a name and home_location")
+        profiles.append(UserProfile(
+            entry['name'],
+            entry['home_location'],
+            spotify_token=entry.get('spotify_token'),
+            calendar_token=entry.get('calendar_token'),
+            data_dir=entry.get('data_dir')
+        ))
+
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"User names in {path} must be unique")
+    return profiles
+
+class BatchSearch:
+    """Searches for many users with one shared set of concert API queries.
+
+    All users' trips are merged per city into shared travel periods, and each
+    shared period only searches the artists followed by someone on that trip.
+    The finder's APIs, response cache and metrics are shared by everyone.
+    """
+
+    def __init__(self, finder: ConcertFinder, profiles: List[UserProfile]):
+        self.finder = finder
+        self.profiles = profiles
+        self.periods = []
+        self._artist_keys = {}
+        self._recipients = {}
+
+    def collect_inputs(self):
+        """Load or fetch every user's artists and travel periods"""
+        for profile in self.profiles:
+            print(f"\n=== {profile.name} ===")
+            os.makedirs(profile.data_dir, exist_ok=True)
+            user_finder = self.finder.for_user(
+                profile.home_location, profile.spotify_token, profile.calendar_token, profile.data_dir
+            )
+            profile.artists = user_finder.get_favorite_artists()
+            profile.artist_keys = {artist_key(artist) for artist in profile.artists}
+            profile.periods = user_finder.get_travel_periods()
+
+    def plan(self) -> List[SearchJob]:
+        """Build the shared search jobs, each distinct query appearing once"""
+        index = ArtistIndex(artist for profile in self.profiles for artist in profile.artists)
+        self._artist_keys = {artist: artist_key(artist) for artist in index.names}
+
+        # Shared periods span every user's overlapping or adjacent trips to a city
+        self.periods = coalesce_periods([period for profile in self.profiles for period in profile.periods])
+        by_city = {}
+        for period in self.periods:
+            period['members'] = []
+            by_city.setdefault(period['city'], []).append(period)
+
+        for user, profile in enumerate(self.profiles):
+            for period in profile.periods:
+                first_day, last_day = period_day(period['start']), period_day(period['end'])
+                # A shared period of the same place, preferring one keyed exactly like this trip
+                candidates = sorted(by_city[period['city']],
+                                    key=lambda candidate: candidate['place'] != period['place'])
+                shared = next(
+                    candidate for candidate in candidates
+                    if same_place(candidate['location'], period['location'])
+                    and period_day(candidate['start']) <= first_day <= period_day(candidate['end'])
+                )
+                shared['members'].append((user, first_day, last_day))
+
+        # Each shared period searches the artists followed by someone on that trip
+        period_artists = {}
+        for period in self.periods:
+            wanted = set()
+            for user, _, _ in period['members']:
+                wanted |= self.profiles[user].artist_keys
+            period_artists[id(period)] = [artist for artist in index.names if self._artist_keys[artist] in wanted]
+        sweep_indexes = {key: ArtistIndex(artists) for key, artists in period_artists.items()}
+
+        return self.finder.planner.plan(
+            self.finder.enabled_apis,
+            self.periods,
+            lambda api, period: period_artists[id(period)],
+            lambda period: sweep_indexes[id(period)]
+        )
+
+    def separate_job_count(self) -> int:
+        """Number of searches the same users would have made running one by one"""
+        return sum(
+            len(self.finder.build_search_jobs(profile.artists, profile.periods))
+            for profile in self.profiles if profile.periods
+        )
+
+    def _assign(self, job: SearchJob, concerts: List[Concert]):
+        """Note which users each of a job's concerts belongs to"""
+        # Tour listings cover all of an artist's trips, so match them by place too
+        periods = [job.period] if job.period is not None else job.periods
+        for concert in concerts:
+            key = self._artist_keys.get(concert.artist) or artist_key(concert.artist)
+            day = concert.local_date
+            for period in periods:
+                if job.period is None and not near(period, concert, self.finder.search_radius_km):
+                    continue
+                for user, first_day, last_day in period['members']:
+                    if first_day <= day <= last_day and key in self.profiles[user].artist_keys:
+                        self._recipients.setdefault(concert.key, set()).add(user)
+
+    def run(self) -> Dict[str, List[Concert]]:
+        """Search once for everyone and return each user's concerts by name"""
+        jobs = self.plan()
+        print(f"\nSearching for {len(self.profiles)} users across {len(self.periods)} shared travel periods: "
+              f"{len(jobs)} searches instead of {self.separate_job_count()} run separately")
+
+        self._recipients = {}
+        concerts = list(self.finder.run_search_jobs(jobs, ordered=True, on_results=self._assign))
+
+        results = {profile.name: [] for profile in self.profiles}
+        for concert in concerts:
+            for user in sorted(self._recipients.get(concert.key, ())):
+                results[self.profiles[user].name].append(concert)
+        for user_concerts in results.values():
+            user_concerts.sort(key=lambda concert: concert.start)
+        return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find concerts for several people with shared API queries.")
+    parser.add_argument('profiles', help="JSON file listing the users")
+    parser.add_argument('--offline', action='store_true',
+                        help="use only saved artists, calendar events and cached concert results")
+    parser.add_argument('--apis', nargs='+', choices=API_NAMES,
+                        help="concert APIs to use (default: every API with credentials in config.py)")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f"folder for each user's <name>.ndjson results (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--verbose', action='store_true', help="print every user's concerts")
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help="write per-API request metrics as JSON when the search ends")
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help="write per-API request metrics in Prometheus text format")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiles = load_profiles(args.profiles)
+    apis = args.apis or [name for name in API_NAMES if ConcertFinder.check_api_credentials(name)]
+
+    finder = ConcertFinder(selected_apis=apis, offline=args.offline)
+    batch = BatchSearch(finder, profiles)
+    batch.collect_inputs()
+    results = batch.run()
+    write_metrics(finder.metrics, args)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print()
+    for name, concerts in results.items():
+        path = os.path.join(args.output_dir, f"{name}.ndjson")
+        with open(path, 'w') as f:
+            write_ndjson(concerts, f)
+        print(f"{name}: {len(concerts)} concerts, written to {path}")
+        if args.verbose:
+            for concert in concerts:
+                print(format_concert_output(concert))
+
+if __name__ == '__main__':
+    main()
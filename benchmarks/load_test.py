@@ -0,0 +1,199 @@
+"""Offline load test for ConcertFinder.find_concerts.
+
+Starts local stand-ins for the three concert APIs in a separate process,
+generates synthetic Spotify artists and calendar trips, runs a full search
+and reports wall time, time to the first streamed concert, requests per
+second and peak memory. No credentials or network access are needed.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --artists 2000 --trips 50 --latency-ms 30
+    python benchmarks/load_test.py --error-rate 0.02 --throttle-rate 0.01 --json load_history.jsonl
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from types import SimpleNamespace
+from urllib.request import urlopen
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from benchmarks.mock_providers import CITIES, SyntheticWorld, artist_names, serve
+from concert_apis import SeatGeekAPI, BandsInTownAPI, SongkickAPI
+from concert_finder import ConcertFinder
+from travel_periods import coalesce_periods
+
+def synthetic_calendar(trips: int, start, seed: int):
+    """Calendar events for trips of a few days, several events per trip"""
+    rng = random.Random(seed)
+    events = []
+    for _ in range(trips):
+        city, state, country = rng.choice(CITIES)
+        first_day = start + timedelta(days=rng.randrange(330))
+        for offset in range(rng.randrange(1, 4)):
+            day = first_day + timedelta(days=offset)
+            # Free-text locations, as people type them into calendars
+            events.append({
+                'location': f"{city} Marriott, 100 Main St, {city}, {state}",
+                'start': f"{day.isoformat()}T09:00:00",
+                'end': f"{day.isoformat()}T17:00:00"
+            })
+    return events
+
+def build_apis(names, base_url):
+    factories = {
+        'seatgeek': lambda: SeatGeekAPI('bench-id', 'bench-secret'),
+        'bandsintown': lambda: BandsInTownAPI('bench-app'),
+        'songkick': lambda: SongkickAPI('bench-key')
+    }
+    apis = []
+    for name in names:
+        api = factories[name]()
+        api.base_url = f"{base_url}/{name}"
+        apis.append(api)
+    return apis
+
+def peak_rss_mb():
+    """Peak resident memory of this process, if the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test find_concerts against local mock concert APIs.")
+    parser.add_argument('--artists', type=int, default=200, help="synthetic followed artists (default: 200)")
+    parser.add_argument('--trips', type=int, default=10, help="synthetic trips (default: 10)")
+    parser.add_argument('--providers', nargs='+', default=['seatgeek', 'bandsintown', 'songkick'],
+                        choices=['seatgeek', 'bandsintown', 'songkick'])
+    parser.add_argument('--workers', type=int, default=8, help="MAX_WORKERS (default: 8)")
+    parser.add_argument('--provider-concurrency', type=int, default=4,
+                        help="PROVIDER_CONCURRENCY for every provider (default: 4)")
+    parser.add_argument('--no-sweep', action='store_true', help="search city calendars artist by artist")
+    parser.add_argument('--no-tour', action='store_true', help="search artist tours trip by trip")
+    parser.add_argument('--latency-ms', type=float, default=10, help="server latency per request (default: 10)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of 500 responses")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429s (default: 1)")
+    parser.add_argument('--rate-limit', type=float, help="RATE_LIMITS requests per second for every provider")
+    parser.add_argument('--deadline', type=float, help="stop the search after this many seconds")
+    parser.add_argument('--max-requests', type=int, help="stop the search after this many requests")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="also report peak Python allocations (slows the run)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help="show the finder's own output")
+    parser.add_argument('--json', metavar='FILE', help="append the results to a JSON lines file")
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve,
+        args=(port_queue, args.artists, args.latency_ms, args.error_rate, args.throttle_rate, args.seed,
+              args.retry_after),
+        daemon=True
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{port_queue.get(timeout=60)}"
+
+    try:
+        start_day = SyntheticWorld(0).start
+        artists = artist_names(args.artists)
+        calendar_events = synthetic_calendar(args.trips, start_day, args.seed)
+
+        settings = SimpleNamespace(
+            MAX_WORKERS=args.workers,
+            PROVIDER_CONCURRENCY={name: args.provider_concurrency for name in args.providers},
+            SWEEP_SEARCH=not args.no_sweep,
+            TOUR_SEARCH=not args.no_tour,
+            RATE_LIMITS={name: args.rate_limit for name in args.providers} if args.rate_limit else {},
+            CACHE_ENABLED=False
+        )
+        finder = ConcertFinder.from_apis(build_apis(args.providers, base_url), "Nowhere", settings)
+        finder.run_state_path = None  # Every run measures a full search
+        finder.locations_path = None
+        finder.journal_path = None
+        travel_periods = coalesce_periods(finder.locate_events(calendar_events), home_location="Nowhere")
+        estimate = finder.plan_search(artists, travel_periods)
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        output = sys.stdout if args.verbose else open(os.devnull, 'w')
+        concerts = []
+        first_result = None
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            for concert in finder.iter_concerts(artists, travel_periods, deadline=args.deadline,
+                                                max_requests=args.max_requests):
+                if first_result is None:
+                    first_result = time.perf_counter() - started
+                concerts.append(concert)
+        wall_time = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+
+        with urlopen(f"{base_url}/__stats") as response:
+            stats = json.load(response)
+    finally:
+        server.terminate()
+
+    results = {
+        'timestamp': time.time(),
+        'artists': args.artists,
+        'trips': args.trips,
+        'travel_periods': len(travel_periods),
+        'providers': args.providers,
+        'workers': args.workers,
+        'sweep': not args.no_sweep,
+        'tour': not args.no_tour,
+        'latency_ms': args.latency_ms,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'rate_limit': args.rate_limit,
+        'wall_seconds': wall_time,
+        'first_result_seconds': first_result,
+        'requests': stats['requests'],
+        'estimated_requests': sum(entry['requests'] for entry in estimate.values()),
+        'requests_per_second': stats['requests'] / wall_time if wall_time else 0,
+        'bytes_received': stats['bytes_sent'],
+        'concerts_found': len(concerts),
+        'unsearched': len(finder.unsearched),
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_traced_mb': traced_peak / (1024 * 1024) if traced_peak is not None else None,
+        'server': stats['providers'],
+        'client': finder.metrics.summary()
+    }
+
+    print(f"{args.artists} artists x {len(travel_periods)} travel periods "
+          f"({args.trips} trips), providers: {', '.join(args.providers)}")
+    print(f"  wall time      {wall_time:10.2f} s")
+    if first_result is not None:
+        print(f"  first result   {first_result:10.2f} s")
+    print(f"  requests       {stats['requests']:10d} (planned {results['estimated_requests']:.0f})")
+    print(f"  requests/sec   {results['requests_per_second']:10.1f}")
+    print(f"  concerts found {len(concerts):10d}")
+    if finder.unsearched:
+        print(f"  not searched   {len(finder.unsearched):10d} searches")
+    if results['peak_rss_mb'] is not None:
+        print(f"  peak RSS       {results['peak_rss_mb']:10.1f} MB")
+    if results['peak_traced_mb'] is not None:
+        print(f"  peak traced    {results['peak_traced_mb']:10.1f} MB")
+    for provider, entry in sorted(stats['providers'].items()):
+        statuses = ', '.join(f"{status}: {count}" for status, count in sorted(entry['statuses'].items()))
+        print(f"  {provider:<14} {entry['requests']:10d} requests ({statuses})")
+    print(finder.metrics.report())
+
+    if args.json:
+        with open(args.json, 'a') as f:
+            f.write(json.dumps(results) + '\n')
+
+if __name__ == '__main__':
+    main()
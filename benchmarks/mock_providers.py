@@ -0,0 +1,272 @@
+"""Local stand-ins for the SeatGeek, Bandsintown and Songkick APIs.
+
+A deterministic synthetic tour schedule is served with the same response
+shapes the ConcertAPI subclasses parse, under one server:
+
+    /seatgeek/events
+    /bandsintown/<artist>/events
+    /songkick/search/locations.json
+    /songkick/events.json
+    /__stats                          request counts by provider and status
+
+Latency, server errors and 429 throttling can be injected to see how the
+search engine copes with slow or flaky providers. Successful responses carry
+an ETag, and a request whose If-None-Match still matches gets 304 Not Modified.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+CITIES = [
+    ('New York', 'NY', 'US'), ('Los Angeles', 'CA', 'US'), ('Chicago', 'IL', 'US'),
+    ('Houston', 'TX', 'US'), ('Phoenix', 'AZ', 'US'), ('Philadelphia', 'PA', 'US'),
+    ('San Antonio', 'TX', 'US'), ('San Diego', 'CA', 'US'), ('Dallas', 'TX', 'US'),
+    ('Austin', 'TX', 'US'), ('Denver', 'CO', 'US'), ('Seattle', 'WA', 'US'),
+    ('Nashville', 'TN', 'US'), ('Boston', 'MA', 'US'), ('Portland', 'OR', 'US'),
+    ('Atlanta', 'GA', 'US'), ('Miami', 'FL', 'US'), ('Minneapolis', 'MN', 'US'),
+    ('San Francisco', 'CA', 'US'), ('Detroit', 'MI', 'US')
+]
+
+# City centres; each venue sits a little way from its city's centre
+CITY_COORDINATES = {
+    'New York': (40.7128, -74.0060), 'Los Angeles': (34.0522, -118.2437), 'Chicago': (41.8781, -87.6298),
+    'Houston': (29.7604, -95.3698), 'Phoenix': (33.4484, -112.0740), 'Philadelphia': (39.9526, -75.1652),
+    'San Antonio': (29.4241, -98.4936), 'San Diego': (32.7157, -117.1611), 'Dallas': (32.7767, -96.7970),
+    'Austin': (30.2672, -97.7431), 'Denver': (39.7392, -104.9903), 'Seattle': (47.6062, -122.3321),
+    'Nashville': (36.1627, -86.7816), 'Boston': (42.3601, -71.0589), 'Portland': (45.5152, -122.6784),
+    'Atlanta': (33.7490, -84.3880), 'Miami': (25.7617, -80.1918), 'Minneapolis': (44.9778, -93.2650),
+    'San Francisco': (37.7749, -122.4194), 'Detroit': (42.3314, -83.0458)
+}
+
+def artist_names(count: int):
+    return [f"Artist {i:05d}" for i in range(count)]
+
+class SyntheticWorld:
+    """A reproducible year of concerts for a pool of synthetic artists"""
+
+    def __init__(self, artists: int, events_per_artist: int = 20, start: date = None,
+                 days: int = 365, seed: int = 1):
+        rng = random.Random(seed)
+        self.start = start or date.today()
+        self.by_city = {}
+        self.by_artist = {}
+
+        event_id = 0
+        for artist in artist_names(artists):
+            for _ in range(events_per_artist):
+                event_id += 1
+                city, state, country = rng.choice(CITIES)
+                day = self.start + timedelta(days=rng.randrange(days))
+                hall = rng.randrange(5)
+                latitude, longitude = CITY_COORDINATES[city]
+                event = {
+                    'artist': artist,
+                    'city': city,
+                    'state': state,
+                    'country': country,
+                    'venue': f"{city} Hall {hall}",
+                    'latitude': round(latitude + 0.02 * hall, 4),
+                    'longitude': round(longitude - 0.02 * hall, 4),
+                    'day': day.isoformat(),
+                    'time': f"{rng.choice([19, 20, 21])}:00:00",
+                    'id': event_id,
+                    'price': rng.randrange(20, 150)
+                }
+                self.by_city.setdefault(city.lower(), []).append(event)
+                self.by_artist.setdefault(artist.lower(), []).append(event)
+
+    def city_events(self, city: str, first: str, last: str):
+        return [e for e in self.by_city.get(city.lower(), []) if first <= e['day'] <= last]
+
+    def artist_events(self, artist: str, first: str, last: str):
+        return [e for e in self.by_artist.get(artist.lower(), []) if first <= e['day'] <= last]
+
+def seatgeek_event(event):
+    return {
+        'id': event['id'],
+        'datetime_local': f"{event['day']}T{event['time']}",
+        'url': f"https://seatgeek.example/e/{event['id']}",
+        'performers': [{'name': event['artist'], 'slug': event['artist'].lower().replace(' ', '-')}],
+        'venue': {'name': event['venue'], 'city': event['city'], 'state': event['state'],
+                  'country': event['country'],
+                  'location': {'lat': event['latitude'], 'lon': event['longitude']}},
+        'stats': {'lowest_price': event['price'], 'highest_price': event['price'] * 3}
+    }
+
+def bandsintown_event(event):
+    return {
+        'id': str(event['id']),
+        'datetime': f"{event['day']}T{event['time']}",
+        'url': f"https://bandsintown.example/e/{event['id']}",
+        'venue': {'name': event['venue'], 'city': event['city'], 'region': event['state'],
+                  'country': event['country'],
+                  # Bandsintown sends coordinates as strings
+                  'latitude': str(event['latitude']), 'longitude': str(event['longitude'])}
+    }
+
+def songkick_event(event):
+    return {
+        'id': event['id'],
+        'uri': f"https://songkick.example/e/{event['id']}",
+        'performance': [{'displayName': event['artist']}],
+        'venue': {'displayName': event['venue'], 'lat': event['latitude'], 'lng': event['longitude']},
+        'location': {'city': f"{event['city']}, {event['state']}, {event['country']}"},
+        'start': {'date': event['day'], 'datetime': None}
+    }
+
+def page_of(items, params, default_size):
+    page = int(params.get('page', 1))
+    per_page = int(params.get('per_page', default_size))
+    return items[(page - 1) * per_page:page * per_page], page, per_page
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, world, latency_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, seed=1, address=('127.0.0.1', 0)):
+        super().__init__(address, MockProviderHandler)
+        self.world = world
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.bytes_sent = 0
+
+    def record(self, provider, status, size):
+        with self.lock:
+            self.counts[(provider, status)] += 1
+            self.bytes_sent += size
+
+    def stats(self):
+        with self.lock:
+            providers = {}
+            for (provider, status), count in self.counts.items():
+                entry = providers.setdefault(provider, {'requests': 0, 'statuses': {}})
+                entry['requests'] += count
+                entry['statuses'][str(status)] = count
+            return {
+                'requests': sum(self.counts.values()),
+                'bytes_sent': self.bytes_sent,
+                'providers': providers
+            }
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, provider, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        headers = dict(headers or {})
+        if status == 200:
+            # The schedule is deterministic, so unchanged listings keep their ETag
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.server.record(provider, 304, 0)
+                return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(provider, status, len(body))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        provider = parts[0]
+
+        if provider == '__stats':
+            body = json.dumps(self.server.stats()).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            roll = server.rng.random()
+        if roll < server.throttle_rate:
+            self.send_json(provider, {'error': 'Too many requests'}, status=429,
+                           headers={'Retry-After': str(server.retry_after)})
+            return
+        if roll < server.throttle_rate + server.error_rate:
+            self.send_json(provider, {'error': 'Internal error'}, status=500)
+            return
+
+        handler = {
+            'seatgeek': self.seatgeek,
+            'bandsintown': self.bandsintown,
+            'songkick': self.songkick
+        }.get(provider)
+        if handler is None:
+            self.send_json(provider or 'unknown', {'error': 'Not found'}, status=404)
+            return
+        handler(parts[1:], params)
+
+    def seatgeek(self, path, params):
+        events = self.server.world.city_events(
+            params.get('venue.city', ''), params['datetime_local.gte'], params['datetime_local.lte']
+        )
+        if params.get('q'):
+            events = [e for e in events if e['artist'].lower() == params['q'].lower()]
+        items, page, per_page = page_of(events, params, 10)
+        self.send_json('seatgeek', {
+            'events': [seatgeek_event(e) for e in items],
+            'meta': {'total': len(events), 'page': page, 'per_page': per_page}
+        })
+
+    def bandsintown(self, path, params):
+        if params['date'] == 'upcoming':
+            first, last = date.today().isoformat(), '9999-12-31'
+        else:
+            first, last = params['date'].split(',')
+        events = self.server.world.artist_events(path[0], first, last)
+        self.send_json('bandsintown', [bandsintown_event(e) for e in events])
+
+    def songkick(self, path, params):
+        if path[-1] == 'locations.json':
+            matches = [i for i, city in enumerate(CITIES, 1) if city[0].lower() == params['query'].lower()]
+            locations = [{'metroArea': {'id': matches[0]}}] if matches else []
+            self.send_json('songkick', {'resultsPage': {'results': {'location': locations}}})
+            return
+
+        metro_id = int(params['location'].split(':')[1])
+        city = CITIES[metro_id - 1][0]
+        events = self.server.world.city_events(city, params['min_date'], params['max_date'])
+        items, page, per_page = page_of(events, params, 50)
+        self.send_json('songkick', {'resultsPage': {
+            'totalEntries': len(events),
+            'perPage': per_page,
+            'page': page,
+            'results': {'event': [songkick_event(e) for e in items]}
+        }})
+
+def serve(port_queue, artists, latency_ms, error_rate, throttle_rate, seed, retry_after=1):
+    """Run a server until the process is terminated, reporting its port first"""
+    world = SyntheticWorld(artists, seed=seed)
+    server = MockProviderServer(world, latency_ms, error_rate, throttle_rate, retry_after, seed=seed)
+    port_queue.put(server.server_port)
+    server.serve_forever()
@@ -0,0 +1,89 @@
+"""Measure how long Concert Finder takes to import and initialize.
+
+Each sample runs in a fresh interpreter so module caches don't hide
+import cost. Run from the project folder (config.py must exist):
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 --json startup_history.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load once Spotify, Calendar or HTTP is needed
+HEAVY_MODULES = [
+    'spotipy',
+    'googleapiclient.discovery',
+    'google_auth_oauthlib.flow',
+    'requests'
+]
+
+SAMPLE_SCRIPT = '''
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+import concert_finder
+imported = time.perf_counter()
+import config
+config.CACHE_PATH = {cache_path!r}
+with contextlib.redirect_stdout(io.StringIO()):
+    finder = concert_finder.ConcertFinder(selected_apis={apis!r}, offline={offline!r})
+initialized = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (initialized - imported) * 1000,
+    'heavy_modules': [m for m in {heavy!r} if m in sys.modules]
+}}))
+'''
+
+def run_sample(apis, offline, cache_path):
+    """Time one cold import and initialization in a new interpreter"""
+    script = SAMPLE_SCRIPT.format(apis=apis, offline=offline, heavy=HEAVY_MODULES, cache_path=cache_path)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample['process_ms'] = (time.perf_counter() - start) * 1000
+    return sample
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Concert Finder startup time.")
+    parser.add_argument('--runs', type=int, default=10, help="number of samples (default: 10)")
+    parser.add_argument('--apis', nargs='+', default=['seatgeek', 'bandsintown', 'songkick'],
+                        help="concert APIs to enable")
+    parser.add_argument('--online', action='store_true', help="initialize without offline mode")
+    parser.add_argument('--json', metavar='FILE', help="append the summary to a JSON lines file")
+    args = parser.parse_args()
+
+    # The response cache goes to a temporary folder, not the checkout
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, 'concert_cache.db')
+        samples = [run_sample(args.apis, not args.online, cache_path) for _ in range(args.runs)]
+
+    summary = {
+        'timestamp': time.time(),
+        'runs': args.runs,
+        'offline': not args.online,
+        'heavy_modules_after_init': samples[-1]['heavy_modules']
+    }
+    print(f"Startup over {args.runs} runs ({'online' if args.online else 'offline'} mode):")
+    for metric in ('import_ms', 'init_ms', 'process_ms'):
+        values = [sample[metric] for sample in samples]
+        summary[metric] = {'median': statistics.median(values), 'min': min(values)}
+        print(f"  {metric:<11} median {statistics.median(values):8.1f}  min {min(values):8.1f}")
+    print(f"  loaded after init: {', '.join(summary['heavy_modules_after_init']) or 'none'}")
+
+    if args.json:
+        with open(args.json, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Optional
+
+class BudgetExhausted(Exception):
+    """A search ran out of time or of requests it may send"""
+
+class SearchBudget:
+    """Wall-clock deadline and request allowance for one search.
+
+    Concert APIs call spend() before every request they send. Once the
+    deadline has passed or max_requests have been sent it raises
+    BudgetExhausted, and the search engine starts no further searches.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, max_requests: Optional[int] = None):
+        self.deadline = deadline
+        self.max_requests = max_requests
+        self.requests = 0
+        self._expires = None if deadline is None else time.monotonic() + deadline
+        self._lock = threading.Lock()
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the deadline, or None without one"""
+        if self._expires is None:
+            return None
+        return max(0.0, self._expires - time.monotonic())
+
+    @property
+    def out_of_time(self) -> bool:
+        return self.time_left() == 0
+
+    @property
+    def out_of_requests(self) -> bool:
+        return self.max_requests is not None and self.requests >= self.max_requests
+
+    @property
+    def exhausted(self) -> bool:
+        return self.out_of_time or self.out_of_requests
+
+    @property
+    def reason(self) -> str:
+        if self.out_of_time:
+            return f"the {self.deadline:g}s deadline passed"
+        if self.out_of_requests:
+            return f"all {self.max_requests} requests were used"
+        return "the budget is not used up"
+
+    def spend(self):
+        """Count one request, raising BudgetExhausted if it may not be sent"""
+        with self._lock:
+            if self.exhausted:
+                raise BudgetExhausted(self.reason)
+            self.requests += 1
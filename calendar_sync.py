@@ -0,0 +1,114 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+from json_store import load_json, save_json_atomic
+from travel_periods import period_day
+
+DEFAULT_STORE_PATH = 'calendar_events.json'
+
+# Only the fields needed to build travel periods are requested
+EVENT_FIELDS = 'nextPageToken,nextSyncToken,items(id,status,location,start,end)'
+PAGE_SIZE = 2500  # Calendar API maximum
+
+class CalendarSync:
+    """Keeps a local copy of a Google Calendar up to date.
+
+    The first run pages through every event and stores the sync token the
+    Calendar API returns. Later runs send that token and only receive events
+    that changed since, which is usually a single small request. Events
+    that have ended are dropped from the store, so it only grows with the
+    calendar's upcoming events.
+    """
+
+    def __init__(self, calendar, path: str = DEFAULT_STORE_PATH, calendar_id: str = 'primary'):
+        self.calendar = calendar
+        self.path = path
+        self.calendar_id = calendar_id
+        self.sync_token = None
+        self.events = {}
+        self.load()
+
+    def load(self):
+        """Load stored events and sync token, starting empty if there are none"""
+        data = load_json(self.path, 'calendar store')
+        if data is not None and data.get('calendar_id') == self.calendar_id:
+            self.sync_token = data.get('sync_token')
+            self.events = data.get('events', {})
+
+    def save(self):
+        save_json_atomic(self.path, {
+            'calendar_id': self.calendar_id,
+            'sync_token': self.sync_token,
+            'events': self.events
+        })
+
+    def stored_events(self) -> List[Dict]:
+        """Events from the last sync, without contacting Google"""
+        return list(self.events.values())
+
+    def sync(self) -> List[Dict]:
+        """Bring the local store up to date and return every stored event"""
+        from googleapiclient.errors import HttpError
+
+        if self.sync_token:
+            try:
+                changed = self._fetch(sync_token=self.sync_token)
+                print(f"Calendar sync: {changed} changed events")
+            except HttpError as e:
+                # 410 Gone means the token expired and a full sync is required
+                if e.resp.status != 410:
+                    raise
+                self.sync_token = None
+
+        if not self.sync_token:
+            self.events = {}
+            changed = self._fetch()
+            print(f"Calendar sync: downloaded {changed} events")
+
+        self.drop_past_events()
+        self.save()
+        return self.stored_events()
+
+    def drop_past_events(self, today: Optional[date] = None):
+        """Forget events that ended before today; trips only look ahead"""
+        today = today or date.today()
+        self.events = {
+            event_id: event for event_id, event in self.events.items()
+            if period_day(event['end']) >= today
+        }
+
+    def _fetch(self, sync_token: Optional[str] = None) -> int:
+        """Apply every page of a full or incremental listing, returning the number of events"""
+        changed = 0
+        page_token = None
+
+        while True:
+            params = {
+                'calendarId': self.calendar_id,
+                'singleEvents': True,
+                'maxResults': PAGE_SIZE,
+                'fields': EVENT_FIELDS
+            }
+            if sync_token:
+                params['syncToken'] = sync_token
+            if page_token:
+                params['pageToken'] = page_token
+
+            result = self.calendar.events().list(**params).execute()
+
+            for item in result.get('items', []):
+                changed += 1
+                if item.get('status') == 'cancelled':
+                    self.events.pop(item['id'], None)
+                else:
+                    self.events[item['id']] = {
+                        'id': item['id'],
+                        'location': item.get('location'),
+                        'start': item['start'].get('dateTime', item['start'].get('date')),
+                        'end': item['end'].get('dateTime', item['end'].get('date'))
+                    }
+
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                self.sync_token = result.get('nextSyncToken')
+                return changed
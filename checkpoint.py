@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List
+
+from artist_index import artist_key
+from concert import Concert
+from run_state import period_key
+
+DEFAULT_JOURNAL_PATH = 'search_journal.jsonl'
+
+def job_key(job) -> str:
+    """Identity of a search job, the same in every run that builds it"""
+    pairs = sorted(f"{artist_key(artist)}|{period_key(period)}" for artist, period in job.pairs())
+    digest = hashlib.sha1('\n'.join(pairs).encode('utf-8')).hexdigest()
+    return f"{type(job).__name__}|{job.provider}|{digest}"
+
+def search_fingerprint(artists: Iterable[str], periods: Iterable[Dict], providers: Iterable[str]) -> str:
+    """Identity of a whole search, so a journal is only resumed by the same search"""
+    inputs = {
+        'artists': sorted({artist_key(artist) for artist in artists}),
+        'periods': sorted(period_key(period) for period in periods),
+        'providers': sorted(providers)
+    }
+    return hashlib.sha1(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+class SearchJournal:
+    """Append-only log of finished search jobs and the concerts each one found.
+
+    The first line identifies the search and when it started; every later
+    line is one finished job. Lines are synced to disk as they are written,
+    so a search stopped by Ctrl-C, a crash or a dropped connection can resume
+    after its last finished job. A half-written last line is ignored.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, fingerprint: str = '', resume: bool = False):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.started_at = time.time()
+        self.completed = {}
+        if resume:
+            self.load()
+        self.resumed = bool(self.completed)
+
+        if self.resumed:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write({'fingerprint': self.fingerprint, 'started_at': self.started_at})
+
+    def load(self):
+        """Read the finished jobs of an earlier run of the same search"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            lines = iter(f)
+            try:
+                header = json.loads(next(lines))
+            except (StopIteration, ValueError):
+                return
+            if header.get('fingerprint') != self.fingerprint:
+                print("The saved search was for different artists, trips or APIs; starting over")
+                return
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The run stopped while writing this line
+                    break
+                self.completed[entry['job']] = entry['concerts']
+        self.started_at = header.get('started_at', self.started_at)
+
+    def _write(self, entry: Dict):
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_done(self, job) -> bool:
+        return job_key(job) in self.completed
+
+    def record(self, job, concerts: List[Concert]):
+        """Log a finished job and its results"""
+        key = job_key(job)
+        records = [concert.as_record() for concert in concerts]
+        self._write({'job': key, 'concerts': records})
+        self.completed[key] = records
+
+    def replay(self) -> List[Concert]:
+        """Concerts found by the jobs an earlier run finished"""
+        return [Concert.from_record(record) for records in self.completed.values() for record in records]
+
+    def close(self, finished: bool = False):
+        """Close the journal, deleting it once the whole search has finished"""
+        self._file.close()
+        if finished:
+            os.remove(self.path)
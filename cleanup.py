@@ -11,6 +11,13 @@ def cleanup():
     cleanup_items = [
         '.cache*',              # Spotify cache files
         'token.pickle',         # Google Calendar token
+        'concert_cache.db*',    # Concert API response cache
+        'calendar_events.json', # Local copy of Google Calendar events
+        'artists.json',         # Saved Spotify artist list
+        'run_state.json',       # Searches and concerts from earlier runs
+        'locations.json',       # Calendar locations resolved to cities
+        'search_journal.jsonl', # Finished searches of an interrupted run
+        'users',                # Batch mode tokens and saved data per person
         '*.pyc',               # Python cache files
         '__pycache__',         # Python cache directory
     ]
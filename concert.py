@@ -0,0 +1,198 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from artist_index import artist_key
+from travel_periods import city_key
+
+def parse_start(value: str, tz_name: Optional[str] = None) -> Tuple[datetime, bool]:
+    """Parse a provider's start date or datetime into a timezone-aware datetime.
+
+    Times keep the wall-clock time at the venue. Naive times get the venue's
+    timezone when the provider names one, otherwise UTC. Returns the datetime
+    and whether the provider gave a time of day at all.
+    """
+    has_time = 'T' in value
+    start = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=venue_timezone(tz_name))
+    return start, has_time
+
+def venue_timezone(tz_name: Optional[str]):
+    """The named IANA timezone, or UTC when it's missing or unknown"""
+    if tz_name:
+        try:
+            from zoneinfo import ZoneInfo
+            return ZoneInfo(tz_name)
+        except (ImportError, ValueError, KeyError):
+            # ZoneInfoNotFoundError is a KeyError; systems without tz data land here too
+            pass
+    return timezone.utc
+
+class Concert:
+    """A concert found by one or more providers.
+
+    Dates are parsed once when the record is built, and the venue is kept as
+    separate name, city, region and country fields so sorting, grouping and
+    de-duplication don't have to re-parse strings. Venue coordinates are
+    kept when the provider gives them. When several providers
+    list the same show, merge() folds them into one record and other_sources
+    holds each extra (source, tickets_url) pair.
+    """
+
+    __slots__ = (
+        'source', 'artist', 'venue_name', 'city', 'region', 'country',
+        'start', 'has_time', 'tickets_url', 'lowest_price', 'highest_price',
+        'latitude', 'longitude', 'other_sources'
+    )
+
+    def __init__(self, source: str, artist: str, venue_name: str, city: str, start: datetime,
+                 has_time: bool = True, tickets_url: Optional[str] = None,
+                 region: Optional[str] = None, country: Optional[str] = None,
+                 lowest_price: Optional[float] = None, highest_price: Optional[float] = None,
+                 latitude: Optional[float] = None, longitude: Optional[float] = None):
+        self.source = source
+        self.artist = artist
+        self.venue_name = venue_name
+        self.city = city
+        self.region = region
+        self.country = country
+        self.start = start
+        self.has_time = has_time
+        self.tickets_url = tickets_url
+        self.lowest_price = lowest_price
+        self.highest_price = highest_price
+        self.latitude = latitude
+        self.longitude = longitude
+        self.other_sources = ()
+
+    @property
+    def location(self) -> str:
+        """City with region and country, e.g. "Austin, TX, US" """
+        return ', '.join(part for part in (self.city, self.region, self.country) if part)
+
+    @property
+    def venue(self) -> str:
+        """Venue and location in the "name - city, region" form of the old dicts"""
+        return f"{self.venue_name} - {self.location}"
+
+    @property
+    def date(self) -> str:
+        """Local start as an ISO string, or just the day when no time is known"""
+        if self.has_time:
+            return self.start.strftime('%Y-%m-%dT%H:%M:%S')
+        return self.start.date().isoformat()
+
+    @property
+    def local_date(self):
+        """Day of the concert at the venue"""
+        return self.start.date()
+
+    @property
+    def key(self) -> tuple:
+        """Canonical identity of the show, the same whichever provider listed it.
+
+        Venue names get the same folding as artist names, and the day is the
+        local day at the venue, since providers disagree on times and zones.
+        """
+        return (self.artist, artist_key(self.venue_name), city_key(self.city), self.local_date)
+
+    @property
+    def sources(self) -> Tuple[str, ...]:
+        return (self.source,) + tuple(source for source, _ in self.other_sources)
+
+    @property
+    def ticket_urls(self) -> Dict[str, str]:
+        """Ticket links by source"""
+        pairs = ((self.source, self.tickets_url),) + self.other_sources
+        return {source: url for source, url in pairs if url}
+
+    def merge(self, other: 'Concert'):
+        """Fold in another provider's record of the same show.
+
+        This record's fields win; gaps are filled from the other one, a known
+        start time replaces a bare date and the widest price range is kept.
+        """
+        if other.source not in self.sources:
+            self.other_sources += ((other.source, other.tickets_url),)
+        self.other_sources += tuple(pair for pair in other.other_sources if pair[0] not in self.sources)
+
+        if other.has_time and not self.has_time:
+            self.start = other.start
+            self.has_time = True
+        self.region = self.region or other.region
+        self.country = self.country or other.country
+        self.tickets_url = self.tickets_url or other.tickets_url
+        if self.latitude is None:
+            self.latitude, self.longitude = other.latitude, other.longitude
+
+        if other.lowest_price is not None:
+            self.lowest_price = other.lowest_price if self.lowest_price is None \
+                else min(self.lowest_price, other.lowest_price)
+        if other.highest_price is not None:
+            self.highest_price = other.highest_price if self.highest_price is None \
+                else max(self.highest_price, other.highest_price)
+
+    def as_dict(self) -> Dict:
+        """The dict format providers used to return, plus every source and ticket link"""
+        return {
+            'source': self.source,
+            'artist': self.artist,
+            'venue': self.venue,
+            'date': self.date,
+            'tickets_url': self.tickets_url or 'N/A',
+            'lowest_price': 'N/A' if self.lowest_price is None else self.lowest_price,
+            'highest_price': 'N/A' if self.highest_price is None else self.highest_price,
+            'sources': list(self.sources),
+            'ticket_urls': self.ticket_urls
+        }
+
+    def as_record(self) -> Dict:
+        """Every field as JSON values, which from_record() turns back into the same concert"""
+        record = {name: getattr(self, name) for name in self.__slots__}
+        record['start'] = self.start.isoformat()
+        record['other_sources'] = [list(pair) for pair in self.other_sources]
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'Concert':
+        fields = dict(record)
+        other_sources = fields.pop('other_sources', ())
+        fields['start'] = datetime.fromisoformat(fields['start'])
+        concert = cls(**fields)
+        concert.other_sources = tuple(tuple(pair) for pair in other_sources)
+        return concert
+
+    def __eq__(self, other):
+        if not isinstance(other, Concert):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Concert({self.artist!r}, {self.venue!r}, {self.date!r}, source={self.source!r})"
+
+class ConcertMerger:
+    """Collapses the same show from different providers into one record.
+
+    Records are looked up by their canonical key in a single dict, so each
+    incoming concert costs one hash lookup however many have been seen.
+    """
+
+    def __init__(self):
+        self._by_key = {}
+
+    def add(self, concert: Concert) -> Optional[Concert]:
+        """Return the concert if it's new, or merge it into the earlier record and return None"""
+        key = concert.key
+        existing = self._by_key.get(key)
+        if existing is None:
+            self._by_key[key] = concert
+            return concert
+        existing.merge(concert)
+        return None
+
+    def merge(self, concerts: Iterable[Concert]) -> Iterator[Concert]:
+        """Yield each show the first time it is seen"""
+        for concert in concerts:
+            if self.add(concert) is not None:
+                yield concert
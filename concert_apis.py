@@ -1,24 +1,296 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import requests
+import math
+import random
+import sys
+import threading
+import time
 from typing import List, Dict, Optional
+from response_cache import CacheMiss, conditional_headers
+from rate_limit import RateLimiter, Throttled, parse_retry_after
+from concert import Concert, parse_start
+from artist_index import ArtistIndex
+from travel_periods import city_key, period_days
+from geo import DEFAULT_SEARCH_RADIUS_KM, GeoIndex, coordinates
+
+# (connect, read) timeouts in seconds so a stalled socket can't hang a run
+DEFAULT_TIMEOUT = (5, 30)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = {500, 502, 503, 504}
+THROTTLED_STATUS = 429
+NOT_MODIFIED_STATUS = 304
+
+# Songkick metro areas rarely change, so city lookups are kept for a long time.
+# Cities Songkick doesn't know are retried sooner in case they were misspelled.
+LOCATION_TTL = 90 * 24 * 60 * 60
+UNKNOWN_LOCATION_TTL = 7 * 24 * 60 * 60
+
+class _NoRequestSent(Exception):
+    """Stands in for requests' exceptions until requests is imported; never raised"""
+
+def request_error() -> type:
+    """Base class of requests' exceptions, for except clauses.
+
+    requests is only imported when the first HTTP session is opened, so
+    offline and cache-only runs never load it. Until then no request can
+    have failed, and a stand-in that is never raised is returned instead.
+    """
+    requests = sys.modules.get('requests')
+    return requests.exceptions.RequestException if requests is not None else _NoRequestSent
 
 class ConcertAPI(ABC):
     """Base class for concert API providers"""
     
+    # Short provider key, matching the names used in API selection and config
+    name = None
+    
+    # Transport settings, may be overridden per instance before the first request.
+    # pool_size also caps the requests in flight, page fetches included.
+    timeout = DEFAULT_TIMEOUT
+    max_retries = DEFAULT_MAX_RETRIES
+    backoff_factor = DEFAULT_BACKOFF
+    pool_size = 10
+    
+    # Optional ResponseCache shared by all providers
+    cache = None
+    
+    # When set, responses only come from the cache and requests raise CacheMiss
+    offline = False
+    
+    # Optional MetricsRegistry recording every request and cache lookup
+    metrics = None
+    
+    # Whether sweep_concerts covers many artists with fewer requests than searching each one
+    supports_sweep = False
+    
+    # Whether tour_concerts covers many periods with fewer requests than searching each one
+    supports_tour = False
+    
+    # Venues this close to a travel period's city count as in it
+    search_radius_km = DEFAULT_SEARCH_RADIUS_KM
+    
+    # Deadline and request allowance of the search running now, if it has one
+    budget = None
+    
+    # Results per page of a paged query, and how many concerts a provider
+    # typically lists per day in one city; together they estimate a sweep's cost
+    page_size = 50
+    city_events_per_day = 30
+    
+    def __init__(self):
+        self._session = None
+        self._request_slots = None
+        self._session_lock = threading.Lock()
+        # Paces requests and pauses them after a 429; without a rate it only pauses
+        self.rate_limiter = RateLimiter()
+    
+    @property
+    def session(self) -> 'requests.Session':
+        """Keep-alive session shared by every request to this provider"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # Imported on first use so offline runs never load the HTTP library
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+    
+    @property
+    def request_slots(self) -> threading.BoundedSemaphore:
+        """Limits requests in flight to pool_size, whichever threads send them"""
+        if self._request_slots is None:
+            with self._session_lock:
+                if self._request_slots is None:
+                    self._request_slots = threading.BoundedSemaphore(self.pool_size)
+        return self._request_slots
+    
+    def _get(self, url: str, params: Optional[Dict] = None,
+             headers: Optional[Dict] = None) -> 'requests.Response':
+        """GET with timeouts, retrying 5xx and connection errors with jittered backoff.
+        
+        Requests wait for the rate limiter. 429 responses pause the provider
+        for their Retry-After time and are retried; Throttled is raised once
+        retries run out so the search can be requeued instead of lost.
+        Every request, retries included, is counted against the search
+        budget, which raises BudgetExhausted once it is used up.
+        """
+        if self.offline:
+            raise CacheMiss(f"{self.name} response for {url} is not cached")
+        import requests
+        
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            if self.budget is not None:
+                self.budget.spend()
+            try:
+                with self.request_slots:
+                    started = time.perf_counter()
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                self._record_request(started, response)
+                if response.status_code == THROTTLED_STATUS:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.throttled(retry_after)
+                    if attempt >= self.max_retries:
+                        raise Throttled(self.name, retry_after)
+                    # The next acquire() waits out the pause, so no backoff sleep here
+                    attempt += 1
+                    self._record_retry()
+                    continue
+                self.rate_limiter.succeeded()
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record_request(started, None)
+                if attempt >= self.max_retries:
+                    raise
+            
+            attempt += 1
+            self._record_retry()
+            self._sleep_backoff(attempt)
+    
+    def _record_retry(self):
+        if self.metrics is not None:
+            self.metrics.record_retry(self.name)
+    
+    def _record_request(self, started: float, response: Optional['requests.Response']):
+        if self.metrics is None:
+            return
+        latency = time.perf_counter() - started
+        if response is None:
+            self.metrics.record_request(self.name, latency)
+        else:
+            self.metrics.record_request(self.name, latency, response.status_code, len(response.content))
+    
+    def _cache_lookup(self, key: str):
+        """Look up a cache key, counting the hit or miss; returns (hit, value)"""
+        hit, value = self.cache.get(self.name, key, allow_expired=self.offline)
+        if self.metrics is not None:
+            self.metrics.record_cache(self.name, hit)
+        return hit, value
+    
+    def _get_json(self, url: str, params: Optional[Dict] = None, cache_key: Optional[tuple] = None):
+        """GET a JSON document, served from the response cache when possible.
+        
+        cache_key holds the normalized query parts (artist, city, date window...)
+        and must not include credentials. An expired entry stored with an ETag
+        or Last-Modified is revalidated with a conditional request; a 304 Not
+        Modified renews it without downloading the body again.
+        """
+        key = None
+        stale = None
+        headers = None
+        if self.cache is not None and cache_key is not None:
+            key = self.cache.make_key(self.name, *cache_key)
+            hit, value = self._cache_lookup(key)
+            if hit:
+                return value
+            stale = self.cache.validators(key)
+            if stale is not None:
+                headers = conditional_headers(stale[1], stale[2])
+        
+        response = self._get(url, params=params, headers=headers)
+        if stale is not None:
+            cached, _, _, size = stale
+            not_modified = response.status_code == NOT_MODIFIED_STATUS
+            if self.metrics is not None:
+                self.metrics.record_revalidation(self.name, not_modified, size if not_modified else 0)
+            if not_modified:
+                self.cache.renew(self.name, key, cached)
+                return cached
+        response.raise_for_status()
+        data = response.json()
+        
+        if key is not None:
+            self.cache.set(self.name, key, data, etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return data
+    
+    def _sleep_backoff(self, attempt: int):
+        """Sleep with full jitter exponential backoff"""
+        delay = min(MAX_BACKOFF, self.backoff_factor * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+    
+    def close(self):
+        """Close the pooled session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def search_cost(self, period: Dict) -> float:
+        """Estimated requests search_concerts sends for one artist and period"""
+        return 1
+    
+    def sweep_cost(self, period: Dict) -> float:
+        """Estimated requests sweep_concerts sends for a period, for any number of artists"""
+        return max(1, math.ceil(period_days(period) * self.city_events_per_day / self.page_size))
+    
+    def tour_cost(self, periods: List[Dict]) -> float:
+        """Estimated requests tour_concerts sends for one artist"""
+        return sum(self.search_cost(period) for period in periods)
+    
+    def shared_requests(self, period: Dict) -> set:
+        """Requests counted in the costs above that are made only once, however many searches need them"""
+        return set()
+    
     @abstractmethod
-    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Concert]:
         """Search for concerts by artist and location within date range"""
         pass
+    
+    def sweep_concerts(self, artists: List[str], location: str, start_date: str, end_date: str) -> List[Concert]:
+        """Search concerts for many artists at one location within date range.
+        
+        Providers that can list every event in a city override this to match
+        all artists in a single pass; the default searches artist by artist.
+        """
+        concerts = []
+        for artist in artists:
+            concerts.extend(self.search_concerts(artist, location, start_date, end_date))
+        return concerts
+    
+    def tour_concerts(self, artist: str, periods: List[Dict]) -> List[Concert]:
+        """Search concerts for one artist across many travel periods.
+        
+        Providers that list an artist's whole tour override this to fetch it
+        once; the default searches period by period.
+        """
+        concerts = []
+        for period in periods:
+            concerts.extend(self.search_concerts(artist, period['location'], period['start'], period['end']))
+        return concerts
 
 class SeatGeekAPI(ConcertAPI):
+    name = 'seatgeek'
+    supports_sweep = True
+    page_size = 100
+    page_concurrency = 4  # Pages of one query fetched at the same time
+    
     def __init__(self, client_id: str, client_secret: str):
+        super().__init__()
         self.client_id = client_id
         self.client_secret = client_secret
         self.base_url = "https://api.seatgeek.com/2"
     
-    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Concert]:
         """Search concerts using SeatGeek API"""
+        return self._search_city([artist], location, start_date, end_date, query=artist)
+    
+    def sweep_concerts(self, artists: List[str], location: str, start_date: str, end_date: str) -> List[Concert]:
+        """Fetch every concert in the city once and match all artists locally"""
+        return self._search_city(artists, location, start_date, end_date)
+    
+    def _search_city(self, artists: List[str], location: str, start_date: str, end_date: str,
+                     query: Optional[str] = None) -> List[Concert]:
+        """Search concerts in a city, optionally narrowed by a text query"""
         # Format dates
         start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
         end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
@@ -29,91 +301,200 @@ class SeatGeekAPI(ConcertAPI):
         params = {
             'client_id': self.client_id,
             'client_secret': self.client_secret,
-            'q': artist,
             'type': 'concert',
             'datetime_local.gte': start.strftime('%Y-%m-%d'),
             'datetime_local.lte': end.strftime('%Y-%m-%d'),
             'venue.city': city,
-            'per_page': 100
+            'per_page': self.page_size
         }
+        if query:
+            params['q'] = query
         
-        try:
-            response = requests.get(f"{self.base_url}/events", params=params)
-            response.raise_for_status()
-            events = response.json()
-            
-            matching_events = []
-            for event in events.get('events', []):
-                if any(performer['name'].lower() == artist.lower() 
-                      for performer in event['performers']):
-                    matching_events.append({
-                        "source": "SeatGeek",
-                        "artist": artist,
-                        "venue": f"{event['venue']['name']} - {event['venue']['city']}, {event['venue']['state']}",
-                        "date": event['datetime_local'],
-                        "tickets_url": event['url'],
-                        "lowest_price": event.get('stats', {}).get('lowest_price', 'N/A'),
-                        "highest_price": event.get('stats', {}).get('highest_price', 'N/A')
-                    })
+        cache_key = ('events', query or '*', city, params['datetime_local.gte'], params['datetime_local.lte'])
+        
+        index = ArtistIndex.of(artists)
+        
+        matching_events = []
+        for event in self._paged_events(params, cache_key):
+            # An event can match several artists on the same bill.
+            # Performers are matched by name or by SeatGeek's slug of the name.
+            matched = dict.fromkeys(
+                index.resolve(performer['name']) or index.resolve(performer.get('slug'))
+                for performer in event['performers']
+            )
+            matched.pop(None, None)
+            if not matched:
+                continue
             
-            return matching_events
+            venue = event['venue']
+            stats = event.get('stats', {})
+            start, has_time = parse_start(event['datetime_local'], venue.get('timezone'))
+            position = venue.get('location') or {}
+            latitude, longitude = coordinates(position.get('lat'), position.get('lon'))
+            for artist in matched:
+                matching_events.append(Concert(
+                    source="SeatGeek",
+                    artist=artist,
+                    venue_name=venue['name'],
+                    city=venue['city'],
+                    region=venue.get('state'),
+                    country=venue.get('country'),
+                    start=start,
+                    has_time=has_time,
+                    tickets_url=event['url'],
+                    lowest_price=stats.get('lowest_price'),
+                    highest_price=stats.get('highest_price'),
+                    latitude=latitude,
+                    longitude=longitude
+                ))
+        
+        return matching_events
+    
+    def _paged_events(self, params: Dict, cache_key: tuple) -> List[Dict]:
+        """Fetch every page of an events query, requesting later pages concurrently.
+
+        Page requests share the provider's request slots with every other
+        search, so PROVIDER_CONCURRENCY still bounds the requests in flight.
+        """
+        url = f"{self.base_url}/events"
+        first = self._get_json(url, params={**params, 'page': 1}, cache_key=cache_key + (1,))
+        events = list(first.get('events', []))
+        
+        meta = first.get('meta', {})
+        per_page = meta.get('per_page') or self.page_size
+        pages = math.ceil(meta.get('total', 0) / per_page)
+        
+        if pages > 1:
+            def fetch_page(page: int) -> Dict:
+                return self._get_json(url, params={**params, 'page': page}, cache_key=cache_key + (page,))
             
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching SeatGeek for {artist}: {e}")
-            return []
+            workers = min(self.page_concurrency, self.pool_size, pages - 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for data in pool.map(fetch_page, range(2, pages + 1)):
+                    events.extend(data.get('events', []))
+        
+        return events
 
 class BandsInTownAPI(ConcertAPI):
+    name = 'bandsintown'
+    supports_tour = True
+    
     def __init__(self, app_id: str):
+        super().__init__()
         self.app_id = app_id
         self.base_url = "https://rest.bandsintown.com/artists"
     
-    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Concert]:
         """Search concerts using Bandsintown API"""
-        # Format dates for Bandsintown API
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        period = {'location': location, 'start': start_date, 'end': end_date}
+        return self.tour_concerts(artist, [period])
+    
+    def tour_cost(self, periods: List[Dict]) -> float:
+        # One request covers the dates of every period
+        return 1
+    
+    def tour_concerts(self, artist: str, periods: List[Dict]) -> List[Concert]:
+        """Fetch the artist's events once for all periods and assign them locally"""
+        # Events are matched to periods by whole days
+        windows = [
+            (datetime.fromisoformat(period['start'].replace('Z', '+00:00')).date(),
+             datetime.fromisoformat(period['end'].replace('Z', '+00:00')).date())
+            for period in periods
+        ]
         
+        # The whole upcoming listing is fetched and filtered locally, so its
+        # cache entry stays valid when trips are added or pass
         url = f"{self.base_url}/{artist}/events"
-        params = {
-            "app_id": self.app_id,
-            "date": f"{start.strftime('%Y-%m-%d')},{end.strftime('%Y-%m-%d')}"
-        }
+        params = {"app_id": self.app_id, "date": "upcoming"}
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            events = response.json()
-            
-            # Filter events by location
-            city = location.split(',')[0].strip().lower()
-            matching_events = []
-            
-            for event in events:
-                event_city = event['venue']['city'].lower()
-                if city in event_city:
-                    matching_events.append({
-                        "source": "Bandsintown",
-                        "artist": artist,
-                        "venue": f"{event['venue']['name']} - {event['venue']['city']}, {event['venue']['country']}",
-                        "date": event['datetime'],
-                        "tickets_url": event.get('url', 'N/A'),
-                        "lowest_price": 'N/A',  # Bandsintown doesn't provide pricing
-                        "highest_price": 'N/A'
-                    })
-            
-            return matching_events
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching Bandsintown for {artist}: {e}")
+            events = self._get_json(url, params=params, cache_key=('events', artist, params['date']))
+        except request_error() as e:
+            # Artists Bandsintown doesn't know may also come back as a 404
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+        
+        # Unknown artists come back as an error object instead of a list
+        if not isinstance(events, list):
             return []
+        
+        # Parse each event once, then filter by period and location
+        concerts = []
+        for event in events:
+            venue = event['venue']
+            start, has_time = parse_start(event['datetime'])
+            latitude, longitude = coordinates(venue.get('latitude'), venue.get('longitude'))
+            concerts.append(Concert(
+                source="Bandsintown",
+                artist=artist,
+                venue_name=venue['name'],
+                city=venue['city'],
+                region=venue.get('region') or None,
+                country=venue.get('country'),
+                start=start,
+                has_time=has_time,
+                tickets_url=event.get('url'),
+                # Bandsintown doesn't provide pricing
+                latitude=latitude,
+                longitude=longitude
+            ))
+        
+        # Venues with coordinates match periods within the search radius,
+        # so a trip to Chicago finds shows in Evanston; the rest match by city
+        nearby = GeoIndex(self.search_radius_km)
+        by_city = {}
+        for concert in concerts:
+            if concert.latitude is not None:
+                nearby.add(concert.latitude, concert.longitude, concert)
+            by_city.setdefault(city_key(concert.city), []).append(concert)
+        
+        matching_events = []
+        for period, (first_day, last_day) in zip(periods, windows):
+            city = period.get('city') or city_key(period['location'])
+            if period.get('latitude') is not None:
+                candidates = nearby.within(period['latitude'], period['longitude'], self.search_radius_km)
+                candidates += [concert for concert in by_city.get(city, []) if concert.latitude is None]
+            else:
+                candidates = by_city.get(city, [])
+            for concert in candidates:
+                if first_day <= concert.local_date <= last_day:
+                    matching_events.append(concert)
+        
+        return matching_events
 
 class SongkickAPI(ConcertAPI):
+    name = 'songkick'
+    supports_sweep = True
+    page_size = 50  # Songkick's maximum
+    
     def __init__(self, api_key: str):
+        super().__init__()
         self.api_key = api_key
         self.base_url = "https://api.songkick.com/api/3.0"
+        self._location_ids = {}
+        self._location_locks = {}
+        self._location_lock = threading.Lock()
     
-    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Concert]:
         """Search concerts using Songkick API"""
+        return self.sweep_concerts([artist], location, start_date, end_date)
+    
+    def search_cost(self, period: Dict) -> float:
+        # Songkick can't filter a city calendar by artist, so one artist costs a
+        # whole sweep, metro area lookup included
+        return self.sweep_cost(period)
+    
+    def sweep_cost(self, period: Dict) -> float:
+        return super().sweep_cost(period) + len(self.shared_requests(period))
+    
+    def shared_requests(self, period: Dict) -> set:
+        # The metro area lookup, unless this run already made it
+        city = city_key(period['location'])
+        return set() if city in self._location_ids else {('location', city)}
+    
+    def sweep_concerts(self, artists: List[str], location: str, start_date: str, end_date: str) -> List[Concert]:
+        """Page through the metro area's event calendar once and match every artist"""
         # First get location ID
         city = location.split(',')[0].strip()
         location_id = self._get_location_id(city)
@@ -129,51 +510,103 @@ class SongkickAPI(ConcertAPI):
             'apikey': self.api_key,
             'location': f'sk:{location_id}',
             'min_date': start.strftime('%Y-%m-%d'),
-            'max_date': end.strftime('%Y-%m-%d')
+            'max_date': end.strftime('%Y-%m-%d'),
+            'per_page': self.page_size
         }
         
-        try:
-            response = requests.get(f"{self.base_url}/events.json", params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            matching_events = []
-            for event in data.get('resultsPage', {}).get('results', {}).get('event', []):
-                if any(performer['displayName'].lower() == artist.lower() 
-                      for performer in event['performance']):
-                    matching_events.append({
-                        "source": "Songkick",
-                        "artist": artist,
-                        "venue": f"{event['venue']['displayName']} - {event['location']['city']}",
-                        "date": event['start']['datetime'] or event['start']['date'],
-                        "tickets_url": event.get('uri', 'N/A'),
-                        "lowest_price": 'N/A',  # Songkick doesn't provide pricing
-                        "highest_price": 'N/A'
-                    })
+        index = ArtistIndex.of(artists)
+        
+        matching_events = []
+        for event in self._paged_events(params):
+            # An event can match several artists on the same bill
+            matched = dict.fromkeys(
+                index.resolve(performer['displayName']) for performer in event['performance']
+            )
+            matched.pop(None, None)
+            if not matched:
+                continue
             
-            return matching_events
+            # Songkick locations read "City, Region, Country" or "City, Country"
+            parts = [part.strip() for part in event['location']['city'].split(',')]
+            start, has_time = parse_start(event['start']['datetime'] or event['start']['date'])
+            latitude, longitude = coordinates(event['venue'].get('lat'), event['venue'].get('lng'))
+            for artist in matched:
+                matching_events.append(Concert(
+                    source="Songkick",
+                    artist=artist,
+                    venue_name=event['venue']['displayName'],
+                    city=parts[0],
+                    region=parts[1] if len(parts) > 2 else None,
+                    country=parts[-1] if len(parts) > 1 else None,
+                    start=start,
+                    has_time=has_time,
+                    tickets_url=event.get('uri'),
+                    # Songkick doesn't provide pricing
+                    latitude=latitude,
+                    longitude=longitude
+                ))
+        
+        return matching_events
+    
+    def _paged_events(self, params: Dict):
+        """Yield events from every page of an events.json query"""
+        page = 1
+        while True:
+            data = self._get_json(
+                f"{self.base_url}/events.json",
+                params={**params, 'page': page},
+                cache_key=('events', params['location'], params['min_date'], params['max_date'], page)
+            )
+            results_page = data.get('resultsPage', {})
+            events = results_page.get('results', {}).get('event', [])
+            yield from events
             
-        except requests.exceptions.RequestException as e:
-            print(f"Error searching Songkick for {artist}: {e}")
-            return []
+            total = results_page.get('totalEntries', 0)
+            per_page = results_page.get('perPage', self.page_size)
+            if not events or page * per_page >= total:
+                return
+            page += 1
     
     def _get_location_id(self, city: str) -> Optional[str]:
-        """Get Songkick location ID for a city"""
+        """Get Songkick location ID for a city, remembered within and across runs"""
+        key = city_key(city)
+        with self._location_lock:
+            city_lock = self._location_locks.setdefault(key, threading.Lock())
+        
+        # Concurrent searches for the same city wait for a single lookup
+        with city_lock:
+            if key in self._location_ids:
+                return self._location_ids[key]
+            
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.name, 'location', key)
+                hit, location_id = self._cache_lookup(cache_key)
+                if hit:
+                    self._location_ids[key] = location_id
+                    return location_id
+            
+            # Failures raise before anything is remembered, since they may be temporary
+            location_id = self._lookup_location_id(city)
+            
+            self._location_ids[key] = location_id
+            if cache_key is not None:
+                ttl = LOCATION_TTL if location_id else UNKNOWN_LOCATION_TTL
+                self.cache.set(self.name, cache_key, location_id, ttl=ttl)
+            return location_id
+    
+    def _lookup_location_id(self, city: str) -> Optional[str]:
+        """Query Songkick for a city's metro area ID"""
         params = {
             'apikey': self.api_key,
             'query': city
         }
         
-        try:
-            response = requests.get(f"{self.base_url}/search/locations.json", params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = data.get('resultsPage', {}).get('results', {}).get('location', [])
-            if results:
-                return str(results[0]['metroArea']['id'])
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Error getting Songkick location ID for {city}: {e}")
+        response = self._get(f"{self.base_url}/search/locations.json", params=params)
+        response.raise_for_status()
+        data = response.json()
         
+        results = data.get('resultsPage', {}).get('results', {}).get('location', [])
+        if results:
+            return str(results[0]['metroArea']['id'])
         return None
@@ -1,25 +1,60 @@
+import argparse
+import contextlib
+import copy
+import json
 import os
 import sys
+import time
 from datetime import datetime, timedelta
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
 import pickle
-from concert_apis import SeatGeekAPI, BandsInTownAPI, SongkickAPI
-from typing import List, Dict
-import itertools
+from search_engine import (
+    SearchEngine, SearchJob,
+    DEFAULT_MAX_WORKERS, DEFAULT_PROVIDER_CONCURRENCY
+)
+from response_cache import (
+    ResponseCache,
+    DEFAULT_CACHE_PATH, DEFAULT_TTL, DEFAULT_MEMORY_ENTRIES, DEFAULT_MAX_BYTES
+)
+from travel_periods import coalesce_periods, period_day
+from calendar_sync import CalendarSync, DEFAULT_STORE_PATH
+from artist_snapshot import ArtistSnapshot, DEFAULT_MAX_AGE, DEFAULT_SNAPSHOT_PATH
+from metrics import MetricsRegistry
+from concert import Concert, ConcertMerger
+from artist_index import ArtistIndex
+from rate_limit import RateLimiter
+from run_state import RunState, DEFAULT_STATE_PATH, DEFAULT_RESCAN_AGE, period_key
+from budget import SearchBudget
+from planner import SearchPlanner, estimate_requests
+from checkpoint import SearchJournal, DEFAULT_JOURNAL_PATH, search_fingerprint
+from geo import LocationResolver, DEFAULT_LOCATIONS_PATH, DEFAULT_SEARCH_RADIUS_KM
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, TextIO
+from concurrent.futures import ThreadPoolExecutor
+
+SPOTIFY_CACHE_PATH = '.cache'
+CALENDAR_TOKEN_PATH = 'token.pickle'
+SPOTIFY_PAGE_SIZE = 50  # Spotify API maximum
+TOP_ARTIST_RANGES = ('long_term', 'medium_term', 'short_term')
 
 class ConcertFinder:
-    def __init__(self, selected_apis=None):
-        """Initialize the concert finder with user-selected APIs."""
+    def __init__(self, selected_apis=None, offline: bool = False):
+        """Initialize the concert finder with user-selected APIs.
+        
+        Spotify and Google Calendar connect on first use, so runs that only
+        need saved data start without any network round trips. With offline
+        set, everything comes from saved artists, calendar events and cached
+        concert API responses.
+        """
+        self.offline = offline
+        self.use_default_paths()
+        
         # Check if config exists and run setup if needed
         if not os.path.exists('config.py'):
             print("\nConfiguration file not found. Running setup...")
             self.run_setup()
             
+        # Imported here so that importing this module stays fast
+        from concert_apis import SeatGeekAPI, BandsInTownAPI, SongkickAPI
+        
         # Import configuration
         try:
             from config import (
@@ -32,6 +67,10 @@ class ConcertFinder:
             self.home_location = HOME_LOCATION
             self.enabled_apis = []
             
+            # Optional performance settings
+            import config
+            self.load_settings(config)
+            
             # Available APIs and their initialization functions
             self.available_apis = {
                 'seatgeek': lambda: SeatGeekAPI(SEATGEEK_CLIENT_ID, SEATGEEK_CLIENT_SECRET),
@@ -47,6 +86,7 @@ class ConcertFinder:
                 if api_name in self.available_apis:
                     try:
                         api = self.available_apis[api_name]()
+                        self.configure_api(api)
                         self.enabled_apis.append(api)
                         print(f"{api_name.title()} API enabled")
                     except Exception as e:
@@ -67,13 +107,135 @@ class ConcertFinder:
             sys.exit(1)
             
         print(f"\nUsing {self.home_location} as home location")
-        self.setup_apis()
+        if offline:
+            print("Offline mode: using saved artists, calendar events and cached concert results")
+        
+    @classmethod
+    def from_apis(cls, apis: List, home_location: str, settings=None, offline: bool = False):
+        """Create a finder for already constructed concert APIs without reading config.py.
+        
+        settings is any object with optional config attributes, such as
+        MAX_WORKERS or CACHE_ENABLED; missing ones use the defaults.
+        """
+        finder = cls.__new__(cls)
+        finder.offline = offline
+        finder.use_default_paths()
+        finder.home_location = home_location
+        finder.load_settings(settings)
+        finder.enabled_apis = []
+        for api in apis:
+            finder.configure_api(api)
+            finder.enabled_apis.append(api)
+        return finder
+        
+    def use_default_paths(self):
+        """Use the single-user token and data files in the working directory."""
+        self._spotify = None
+        self._calendar = None
+        self.spotify_cache_path = SPOTIFY_CACHE_PATH
+        self.calendar_token_path = CALENDAR_TOKEN_PATH
+        self.artist_store_path = DEFAULT_SNAPSHOT_PATH
+        self.calendar_store_path = DEFAULT_STORE_PATH
+        self.run_state_path = DEFAULT_STATE_PATH
+        self.locations_path = DEFAULT_LOCATIONS_PATH
+        self.journal_path = DEFAULT_JOURNAL_PATH
+        
+    def for_user(self, home_location: str, spotify_cache_path: str, calendar_token_path: str,
+                 data_dir: str) -> 'ConcertFinder':
+        """A finder for another person that shares this one's concert APIs, cache and metrics.
+        
+        Their Spotify and Google tokens are read from the given files, and their
+        saved artists and calendar events are kept in data_dir.
+        """
+        finder = copy.copy(self)
+        finder.home_location = home_location
+        finder._spotify = None
+        finder._calendar = None
+        finder.spotify_cache_path = spotify_cache_path
+        finder.calendar_token_path = calendar_token_path
+        finder.artist_store_path = os.path.join(data_dir, DEFAULT_SNAPSHOT_PATH)
+        finder.calendar_store_path = os.path.join(data_dir, DEFAULT_STORE_PATH)
+        finder.run_state_path = os.path.join(data_dir, DEFAULT_STATE_PATH)
+        finder.journal_path = os.path.join(data_dir, DEFAULT_JOURNAL_PATH)
+        return finder
+        
+    def load_settings(self, config):
+        """Read optional settings, falling back to defaults for any that are missing."""
+        from concert_apis import DEFAULT_TIMEOUT, DEFAULT_MAX_RETRIES
+        
+        self.max_workers = getattr(config, 'MAX_WORKERS', DEFAULT_MAX_WORKERS)
+        self.provider_concurrency = getattr(config, 'PROVIDER_CONCURRENCY', {})
+        self.http_timeout = getattr(config, 'HTTP_TIMEOUT', DEFAULT_TIMEOUT)
+        self.http_max_retries = getattr(config, 'HTTP_MAX_RETRIES', DEFAULT_MAX_RETRIES)
+        self.rate_limits = getattr(config, 'RATE_LIMITS', {})
+        self.sweep_search = getattr(config, 'SWEEP_SEARCH', True)
+        self.tour_search = getattr(config, 'TOUR_SEARCH', True)
+        self.artist_max_age = getattr(config, 'ARTIST_REFRESH_HOURS', DEFAULT_MAX_AGE / 3600) * 3600
+        self.rescan_age = getattr(config, 'RESCAN_HOURS', DEFAULT_RESCAN_AGE / 3600) * 3600
+        self.search_radius_km = getattr(config, 'SEARCH_RADIUS_KM', DEFAULT_SEARCH_RADIUS_KM)
+        self.gazetteer_path = getattr(config, 'GAZETTEER_PATH', None)
+        self._locations = None
+        
+        self.metrics = MetricsRegistry()
+        
+        # Provider responses are cached between runs unless disabled
+        self.cache = None
+        if self.offline and not getattr(config, 'CACHE_ENABLED', True):
+            raise ValueError("Offline mode needs the response cache (CACHE_ENABLED = True)")
+        if getattr(config, 'CACHE_ENABLED', True):
+            self.cache = ResponseCache(
+                path=getattr(config, 'CACHE_PATH', DEFAULT_CACHE_PATH),
+                ttls=getattr(config, 'CACHE_TTL', {}),
+                default_ttl=DEFAULT_TTL,
+                memory_entries=getattr(config, 'CACHE_MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES),
+                max_bytes=getattr(config, 'CACHE_MAX_MB', DEFAULT_MAX_BYTES // (1024 * 1024)) * 1024 * 1024
+            )
+        
+    def configure_api(self, api):
+        """Apply transport settings from config to a concert API."""
+        api.timeout = self.http_timeout
+        api.max_retries = self.http_max_retries
+        api.rate_limiter = RateLimiter(self.rate_limits.get(api.name))
+        api.pool_size = self.provider_concurrency.get(api.name, DEFAULT_PROVIDER_CONCURRENCY)
+        api.cache = self.cache
+        api.offline = self.offline
+        api.metrics = self.metrics
+        api.search_radius_km = self.search_radius_km
+        
+    @property
+    def locations(self) -> LocationResolver:
+        """Resolver for calendar locations, loaded on first use."""
+        if self._locations is None:
+            self._locations = LocationResolver(self.locations_path, self.gazetteer_path)
+        return self._locations
+        
+    @property
+    def spotify(self):
+        """Spotify client, connected on first use."""
+        if self._spotify is None:
+            self._connect(self.setup_spotify)
+        return self._spotify
+        
+    @property
+    def calendar(self):
+        """Google Calendar client, connected on first use."""
+        if self._calendar is None:
+            self._connect(self.setup_google_calendar)
+        return self._calendar
         
     def setup_apis(self):
         """Initialize Spotify and Google Calendar APIs."""
+        self._connect(self.setup_spotify)
+        self._connect(self.setup_google_calendar)
+        
+    def _connect(self, setup):
+        """Run a client setup step, exiting with a hint if it fails."""
+        if self.offline:
+            print("\nError: this step needs Spotify or Google Calendar, which offline mode can't reach.")
+            print("Run once without --offline to save your artists and calendar.")
+            sys.exit(1)
         try:
-            self.setup_spotify()
-            self.setup_google_calendar()
+            setup()
         except Exception as e:
             print(f"\nError setting up APIs: {e}")
             print("Try running 'python setup_test.py' to diagnose the issue.")
@@ -81,24 +243,24 @@ class ConcertFinder:
         
     def setup_spotify(self):
         """Initialize Spotify client."""
+        import spotipy
+        from spotipy.oauth2 import SpotifyOAuth
+        from spotipy.cache_handler import CacheFileHandler
+        
         try:
-            # Clear any existing cache
-            cache_files = [f for f in os.listdir('.') if f.startswith('.cache')]
-            for f in cache_files:
-                os.remove(f)
-                
+            # Reuse the cached token so only the first run needs the browser
             self.auth_manager = SpotifyOAuth(
                 client_id=self.spotify_client_id,
                 client_secret=self.spotify_client_secret,
                 redirect_uri="http://localhost:8888/callback",
                 scope="user-follow-read user-top-read",
-                show_dialog=True,
+                cache_handler=CacheFileHandler(cache_path=self.spotify_cache_path),
                 open_browser=True
             )
-            self.spotify = spotipy.Spotify(auth_manager=self.auth_manager)
+            self._spotify = spotipy.Spotify(auth_manager=self.auth_manager)
             
             # Test connection
-            user = self.spotify.current_user()
+            user = self._spotify.current_user()
             print(f"Connected to Spotify as: {user['display_name']}")
             
         except Exception as e:
@@ -107,11 +269,15 @@ class ConcertFinder:
     
     def setup_google_calendar(self):
         """Initialize Google Calendar API client."""
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+        from google.auth.transport.requests import Request
+        
         SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
         creds = None
         
-        if os.path.exists('token.pickle'):
-            with open('token.pickle', 'rb') as token:
+        if os.path.exists(self.calendar_token_path):
+            with open(self.calendar_token_path, 'rb') as token:
                 creds = pickle.load(token)
                 
         if not creds or not creds.valid:
@@ -127,65 +293,130 @@ class ConcertFinder:
                 flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
                 creds = flow.run_local_server(port=0)
             
-            with open('token.pickle', 'wb') as token:
+            with open(self.calendar_token_path, 'wb') as token:
                 pickle.dump(creds, token)
 
-        self.calendar = build('calendar', 'v3', credentials=creds)
+        self._calendar = build('calendar', 'v3', credentials=creds)
         print("Connected to Google Calendar")
         
-    def get_favorite_artists(self) -> List[str]:
-        """Get user's followed and top artists from Spotify."""
-        print("\nFetching artists from Spotify...")
+    def get_favorite_artists(self, refresh: bool = False) -> List[str]:
+        """Get user's followed and top artists, from the saved snapshot when it is recent."""
+        snapshot = ArtistSnapshot(self.artist_store_path)
         
-        # Get followed artists
-        followed_artists = []
-        results = self.spotify.current_user_followed_artists()
+        if self.offline and snapshot.artists:
+            print(f"\nUsing {len(snapshot.artists)} saved artists")
+        elif not refresh and snapshot.is_fresh(self.artist_max_age):
+            print(f"\nUsing {len(snapshot.artists)} saved artists "
+                  f"(fetched {snapshot.age() / 3600:.1f} hours ago)")
+        else:
+            print("\nFetching artists from Spotify...")
+            had_snapshot = bool(snapshot.artists)
+            snapshot.update(self.fetch_spotify_artists())
+            snapshot.save()
+            if had_snapshot and (snapshot.added or snapshot.removed):
+                print(f"{len(snapshot.added)} new artists, {len(snapshot.removed)} removed since last run")
         
-        while results:
-            for item in results['artists']['items']:
-                followed_artists.append(item['name'])
-            if results['artists']['next']:
-                results = self.spotify.next(results['artists'])
-            else:
-                results = None
-                
-        # Get top artists
-        top_artists = self.spotify.current_user_top_artists(limit=50, time_range='long_term')
-        for artist in top_artists['items']:
-            if artist['name'] not in followed_artists:
-                followed_artists.append(artist['name'])
-                
-        print(f"Found {len(followed_artists)} artists to search for")
-        return followed_artists
+        self.artist_snapshot = snapshot
+        print(f"Found {len(snapshot.artists)} artists to search for")
+        # Most listened to first, so a search cut short covers them first
+        return snapshot.ranked_names
+        
+    def fetch_spotify_artists(self) -> List[Dict]:
+        """Fetch followed artists and top artists for every time range concurrently."""
+        # Connect before the threads start, so a first run logs in only once
+        spotify = self.spotify
+        
+        def followed():
+            items = []
+            results = spotify.current_user_followed_artists(limit=SPOTIFY_PAGE_SIZE)
+            while results:
+                items.extend(results['artists']['items'])
+                if results['artists']['next']:
+                    results = spotify.next(results['artists'])
+                else:
+                    results = None
+            return items
+        
+        def top(time_range):
+            return spotify.current_user_top_artists(
+                limit=SPOTIFY_PAGE_SIZE, time_range=time_range
+            )['items']
+        
+        with ThreadPoolExecutor(max_workers=1 + len(TOP_ARTIST_RANGES)) as pool:
+            followed_future = pool.submit(followed)
+            top_futures = [pool.submit(top, time_range) for time_range in TOP_ARTIST_RANGES]
+            followed_items = followed_future.result()
+            top_items = [future.result() for future in top_futures]
+        
+        # Followed artists first, then top artists not already followed
+        artists = {}
+        for item in followed_items:
+            artists.setdefault(item['name'], {
+                'name': item['name'], 'id': item['id'], 'followed': True, 'top_rank': None
+            })
+        for items in top_items:
+            for rank, item in enumerate(items, 1):
+                artist = artists.setdefault(item['name'], {
+                    'name': item['name'], 'id': item['id'], 'followed': False, 'top_rank': None
+                })
+                if artist['top_rank'] is None or rank < artist['top_rank']:
+                    artist['top_rank'] = rank
+        
+        return list(artists.values())
         
     def get_travel_periods(self) -> List[Dict]:
         """Get periods of time and their locations from calendar."""
-        print("\nFetching travel dates from Google Calendar...")
-        
-        start_date = datetime.utcnow()
-        end_date = start_date + timedelta(days=365)  # Look ahead one year
-        
-        events_result = self.calendar.events().list(
-            calendarId='primary',
-            timeMin=start_date.isoformat() + 'Z',
-            timeMax=end_date.isoformat() + 'Z',
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        travel_periods = []
-        for event in events_result.get('items', []):
-            if 'location' in event and event['location'] != self.home_location:
-                travel_periods.append({
-                    'location': event['location'],
-                    'start': event['start'].get('dateTime', event['start'].get('date')),
-                    'end': event['end'].get('dateTime', event['end'].get('date'))
-                })
+        if self.offline:
+            print("\nLoading saved travel dates...")
+            events = CalendarSync(None, self.calendar_store_path).stored_events()
+        else:
+            print("\nFetching travel dates from Google Calendar...")
+            # Only fetch what changed since the last run
+            events = CalendarSync(self.calendar, self.calendar_store_path).sync()
+        
+        start_day = datetime.utcnow().date()
+        end_day = start_day + timedelta(days=365)  # Look ahead one year
         
-        print(f"Found {len(travel_periods)} travel periods")
+        located_events = []
+        for event in sorted(events, key=lambda e: e['start']):
+            if not event.get('location'):
+                continue
+            if period_day(event['end']) < start_day or period_day(event['start']) > end_day:
+                continue
+            located_events.append({
+                'location': event['location'],
+                'start': event['start'],
+                'end': event['end']
+            })
+        # Home is resolved first so locate_events saves its answer too
+        home = self.locations.resolve(self.home_location)
+        located_events = self.locate_events(located_events)
+        
+        # Merge events in the same city into trips and skip events at home
+        travel_periods = coalesce_periods(located_events, home.label if home else self.home_location)
+        
+        print(f"Found {len(travel_periods)} travel periods ({len(located_events)} events with locations)")
         return travel_periods
         
-    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Dict]:
+    def locate_events(self, events: List[Dict]) -> List[Dict]:
+        """Resolve each event's free-text location to a known city.
+        
+        Resolved events get "City, Region, Country" as their location plus the
+        city's latitude and longitude, so "Hilton, 123 Main St, Chicago" is
+        searched as Chicago. Locations the gazetteer doesn't know are kept as
+        written.
+        """
+        located = []
+        for event in events:
+            place = self.locations.resolve(event['location'])
+            if place:
+                event = {**event, 'location': place.label,
+                         'latitude': place.latitude, 'longitude': place.longitude}
+            located.append(event)
+        self.locations.save()
+        return located
+        
+    def search_concerts(self, artist: str, location: str, start_date: str, end_date: str) -> List[Concert]:
         """Search for concerts across all enabled APIs."""
         all_concerts = []
         
@@ -198,50 +429,217 @@ class ConcertFinder:
         
         return all_concerts
             
-    def find_concerts(self) -> List[Dict]:
-        """Main method to find concerts matching travel schedule."""
+    @property
+    def planner(self) -> SearchPlanner:
+        """Chooses each API's query shape, within the SWEEP_SEARCH and TOUR_SEARCH settings."""
+        return SearchPlanner(sweep=self.sweep_search, tour=self.tour_search)
+        
+    def build_search_jobs(self, artists: List[str], travel_periods: List[Dict],
+                          state: Optional[RunState] = None) -> List[SearchJob]:
+        """Split the search into jobs, in the same order as a sequential run.
+        
+        Jobs are listed by priority: the nearest trips first and, for each
+        trip, artists in the given order. Each API's jobs start in this order,
+        so a search stopped by its budget has covered what matters most.
+        
+        Each API gets the query shape the planner estimates is cheapest: city
+        sweeps, tour listings or (artist, period) searches. With a run state,
+        only (artist, period, provider) pairs that were never searched or not
+        within RESCAN_HOURS are searched.
+        """
+        travel_periods = sorted(travel_periods, key=lambda period: period_day(period['start']))
+        
+        # Built once so every sweep resolves performers with a single lookup;
+        # spellings of the same artist are only searched once
+        index = ArtistIndex(artists)
+        artists = index.names
+        
+        now = time.time()
+        def wanted(api, period):
+            if state is None:
+                return artists
+            return [artist for artist in artists
+                    if state.is_stale(api.name, period, artist, self.rescan_age, now)]
+        
+        # A sweep costs the same for any number of artists, so it matches them all
+        return self.planner.plan(self.enabled_apis, travel_periods, wanted, lambda period: index)
+        
+    def plan_search(self, artists: List[str] = None, travel_periods: List[Dict] = None,
+                    incremental: bool = False) -> Dict[str, Dict]:
+        """Estimate the concert API requests a search would send, without sending any.
+        
+        Returns estimate_requests() of the planned jobs: per provider, the
+        estimated requests and the number of searches of each kind.
+        """
+        if artists is None:
+            artists = self.get_favorite_artists()
+        if travel_periods is None:
+            travel_periods = self.get_travel_periods()
+        state = None
+        if incremental and self.run_state_path and os.path.exists(self.run_state_path):
+            state = RunState(self.run_state_path)
+        return estimate_requests(self.build_search_jobs(artists, travel_periods, state))
+        
+    def find_concerts(self, artists: List[str] = None, travel_periods: List[Dict] = None,
+                      incremental: bool = False, resume: bool = False,
+                      deadline: Optional[float] = None, max_requests: Optional[int] = None) -> List[Concert]:
+        """Main method to find concerts matching travel schedule.
+        
+        Artists and travel periods are fetched from Spotify and Google
+        Calendar unless given. Incremental runs only search new or stale
+        (artist, period, provider) pairs. Resumed runs skip the searches an
+        interrupted run of the same search finished. With a deadline in
+        seconds or max_requests, the search stops when either runs out and
+        returns what it found; the searches not made are in unsearched.
+        """
+        return list(self.iter_concerts(artists, travel_periods, ordered=True, incremental=incremental,
+                                       resume=resume, deadline=deadline, max_requests=max_requests))
+
+    def iter_concerts(self, artists: List[str] = None, travel_periods: List[Dict] = None,
+                      ordered: bool = False, incremental: bool = False, resume: bool = False,
+                      deadline: Optional[float] = None, max_requests: Optional[int] = None
+                      ) -> Iterator[Concert]:
+        """Yield each concert as soon as the search that first found it finishes.
+        
+        Concerts come out in the order searches complete; with ordered set they
+        come out in job order instead, exactly as a sequential run would. Other
+        APIs' listings of a show already yielded are merged into that record.
+        
+        Every online run records what it searched and found in the run state;
+        concerts no earlier run found are collected in new_concerts. Finished
+        searches are also logged to the search journal until every search has
+        been made, so with resume a search that was interrupted, or had
+        searches fail, picks up where it stopped and its earlier results are
+        yielded first.
+        
+        The deadline counts from this call, so fetching artists and trips
+        uses part of it.
+        """
         print("\nStarting concert search...")
+        budget = None
+        if deadline is not None or max_requests is not None:
+            budget = SearchBudget(deadline, max_requests)
+        self.unsearched = []
+        self.failed = []
         
-        artists = self.get_favorite_artists()
-        travel_periods = self.get_travel_periods()
+        if artists is None:
+            artists = self.get_favorite_artists()
+        if travel_periods is None:
+            travel_periods = self.get_travel_periods()
         
         if not travel_periods:
             print("\nNo travel periods found in calendar.")
-            return []
+            return
             
-        matching_concerts = []
-        total_searches = len(artists) * len(travel_periods) * len(self.enabled_apis)
-        searches_completed = 0
-        
+        print(f"\nSearching {len(artists)} artists across {len(travel_periods)} travel periods:")
         for period in travel_periods:
-            print(f"\nSearching concerts in {period['location']}")
-            print(f"From {period['start']} to {period['end']}")
-            
-            for artist in artists:
-                concerts = self.search_concerts(
-                    artist,
-                    period['location'],
-                    period['start'],
-                    period['end']
-                )
-                matching_concerts.extend(concerts)
-                
-                searches_completed += 1
-                progress = (searches_completed / total_searches) * 100
-                print(f"Search progress: {progress:.1f}%", end='\r')
+            print(f"- {period['location']}: {period['start']} to {period['end']}")
+        
+        # Offline runs search nothing new, so they leave the run state alone
+        state = None
+        if self.run_state_path and not self.offline:
+            state = RunState(self.run_state_path)
+        jobs = self.build_search_jobs(artists, travel_periods, state if incremental else None)
+        if incremental:
+            print(f"Incremental run: {len(jobs)} searches for new artists, new trips "
+                  f"and pairs not searched in the last {self.rescan_age / 3600:g} hours")
+        
+        journal = None
+        replayed = []
+        if self.journal_path and not self.offline:
+            fingerprint = search_fingerprint(artists, travel_periods, [api.name for api in self.enabled_apis])
+            journal = SearchJournal(self.journal_path, fingerprint, resume)
+            if journal.resumed:
+                replayed = journal.replay()
+                jobs = [job for job in jobs if not journal.is_done(job)]
+                print(f"Resuming: {len(journal.completed)} searches already finished, {len(jobs)} to go")
+            elif resume:
+                print("No interrupted search to resume; starting from the beginning")
+        
+        def record(job: SearchJob, results: List[Concert]):
+            if state is not None:
+                state.record_job(job)
+            if journal is not None:
+                journal.record(job, results)
+        
+        first_run = state is None or state.updated_at is None
+        since = journal.started_at if journal is not None and journal.resumed else None
+        self.new_concerts = []
+        finished = False
+        try:
+            for concert in self.run_search_jobs(jobs, ordered, on_results=record, replayed=replayed,
+                                                budget=budget):
+                if state is not None and state.add_concert(concert, since):
+                    self.new_concerts.append(concert)
+                yield concert
+            finished = True
+        finally:
+            if state is not None:
+                state.prune(travel_periods)
+                state.save()
+            if journal is not None:
+                # A search its budget cut short, or with failed searches, can be finished with --resume
+                journal.close(finished and not self.unsearched and not self.failed)
+        if not first_run:
+            print(f"{len(self.new_concerts)} concerts not found by earlier runs")
+        if (self.unsearched or self.failed) and journal is not None:
+            print("Run again with --resume to make the remaining searches.")
         
-        # Remove duplicates (same artist, venue, and date)
-        unique_concerts = []
-        seen = set()
+    def run_search_jobs(self, jobs: List[SearchJob], ordered: bool = False,
+                        on_results: Optional[Callable[[SearchJob, List[Concert]], None]] = None,
+                        replayed: Iterable[Concert] = (),
+                        budget: Optional[SearchBudget] = None) -> Iterator[Concert]:
+        """Run search jobs with progress output, yielding each show once as it is found.
         
-        for concert in matching_concerts:
-            key = (concert['artist'], concert['venue'], concert['date'])
-            if key not in seen:
-                seen.add(key)
-                unique_concerts.append(concert)
+        on_results, if given, sees every job's own results as soon as the job
+        finishes, before they are merged. replayed holds results of searches
+        an interrupted run already finished; they are yielded first. Jobs a
+        budget stopped are left in unsearched and reported.
+        """
+        def report_progress(completed: int, total: int):
+            progress = (completed / total) * 100
+            print(f"Search progress: {progress:.1f}%", end='\r')
+        
+        engine = SearchEngine(
+            max_workers=self.max_workers,
+            provider_limits=self.provider_concurrency,
+            on_progress=report_progress,
+            metrics=self.metrics,
+            budget=budget
+        )
+        
+        # The same show from several APIs becomes one record. It is yielded
+        # when first found and later sources are merged into it in place.
+        merger = ConcertMerger()
+        yield from merger.merge(replayed)
+        
+        def finished(index: int, results: List[Concert]):
+            # Failed jobs, given up after errors or repeated 429s, didn't really search anything
+            if jobs[index] not in engine.failed:
+                on_results(jobs[index], results)
+        
+        for api in self.enabled_apis:
+            api.budget = budget
+        try:
+            for _, results in engine.iter_results(jobs, ordered=ordered,
+                                                  on_finished=finished if on_results else None):
+                yield from merger.merge(results)
+        finally:
+            for api in self.enabled_apis:
+                api.budget = None
+        self.unsearched = engine.unsearched
+        self.failed = engine.failed
         
         print("\nSearch completed!")
-        return unique_concerts
+        if engine.failed:
+            providers = sorted({job.provider for job in engine.failed})
+            print(f"Warning: {len(engine.failed)} searches failed because {', '.join(providers)} "
+                  f"kept rate limiting requests or returned errors. Try again later, "
+                  f"or set lower RATE_LIMITS if the errors were 429s.")
+        if engine.unsearched:
+            print(f"Stopped early because {budget.reason}; {len(engine.unsearched)} searches were not made:")
+            print(format_unsearched(engine.unsearched))
+        print(self.metrics.report())
 
     def run_setup(self):
         """Run the configuration setup."""
@@ -254,7 +652,8 @@ class ConcertFinder:
             print("Please run 'python setup_config.py' manually to configure the program.")
             sys.exit(1)
             
-    def check_api_credentials(self, api_name: str) -> bool:
+    @staticmethod
+    def check_api_credentials(api_name: str) -> bool:
         """Check if required credentials are available for an API."""
         try:
             from config import (
@@ -333,6 +732,7 @@ class ConcertFinder:
         """Initialize a single API with error handling."""
         try:
             api = self.available_apis[api_name]()
+            self.configure_api(api)
             # Test API connection
             if hasattr(api, 'test_connection'):
                 api.test_connection()
@@ -342,45 +742,168 @@ class ConcertFinder:
             print(f"  → {str(e)}")
             return None
 
-def format_concert_output(concert: Dict) -> str:
-    """Format a concert dictionary into a readable string."""
+def format_concert_output(concert: Concert) -> str:
+    """Format a concert into a readable string."""
     output = [
-        f"\n{concert['artist']} ({concert['source']})",
-        f"Venue: {concert['venue']}",
-        f"Date: {concert['date']}"
+        f"\n{concert.artist} ({', '.join(concert.sources)})",
+        f"Venue: {concert.venue}",
+        f"Date: {concert.date}"
     ]
     
-    if concert['lowest_price'] != 'N/A':
-        output.append(f"Price Range: ${concert['lowest_price']} - ${concert['highest_price']}")
+    if concert.lowest_price is not None:
+        output.append(f"Price Range: ${concert.lowest_price} - ${concert.highest_price}")
     
-    output.append(f"Tickets: {concert['tickets_url']}")
+    ticket_urls = concert.ticket_urls
+    if len(ticket_urls) > 1:
+        output.append("Tickets:")
+        output.extend(f"  {source}: {url}" for source, url in ticket_urls.items())
+    else:
+        output.append(f"Tickets: {concert.tickets_url or 'N/A'}")
     return "\n".join(output)
 
-def main():
+SEARCH_KINDS = {'SearchJob': 'artist searches', 'SweepJob': 'city sweeps', 'TourJob': 'tour listings'}
+
+def format_plan(estimates: Dict[str, Dict]) -> str:
+    """Format plan_search() estimates as a table of requests per API."""
+    lines = ["Search plan (estimated concert API requests):"]
+    for provider, entry in estimates.items():
+        kinds = ', '.join(f"{count} {SEARCH_KINDS.get(kind, kind)}" for kind, count in entry['searches'].items())
+        lines.append(f"  {provider:<12} {entry['requests']:8.0f} requests  ({kinds})")
+    total = sum(entry['requests'] for entry in estimates.values())
+    searches = sum(sum(entry['searches'].values()) for entry in estimates.values())
+    lines.append(f"  {'total':<12} {total:8.0f} requests for {searches} searches")
+    lines.append("Responses still in the cache are not requested again, so a run may send fewer.")
+    return "\n".join(lines)
+
+def format_unsearched(jobs: List[SearchJob], max_artists: int = 5) -> str:
+    """Summarize the trips and artists that searches cut short did not cover."""
+    by_period = {}
+    for job in jobs:
+        for artist, period in job.pairs():
+            entry = by_period.setdefault(period_key(period), (period, {}, set()))
+            entry[1].setdefault(artist, None)
+            entry[2].add(job.provider)
+    
+    lines = []
+    for period, artists, providers in sorted(by_period.values(), key=lambda entry: entry[0]['start']):
+        names = list(artists)
+        shown = ', '.join(names[:max_artists])
+        if len(names) > max_artists:
+            shown += f" and {len(names) - max_artists} more"
+        lines.append(f"- {period['location']} ({period_day(period['start'])} to {period_day(period['end'])}), "
+                     f"{', '.join(sorted(providers))}: {shown}")
+    return "\n".join(lines)
+
+def write_ndjson(concerts: Iterable[Concert], stream: TextIO) -> int:
+    """Write concerts as newline-delimited JSON, flushing each line as it's found."""
+    count = 0
+    for concert in concerts:
+        stream.write(json.dumps(concert.as_dict()) + '\n')
+        stream.flush()
+        count += 1
+    return count
+
+def stream_concerts(finder: 'ConcertFinder', path: str, stdout: TextIO, incremental: bool = False,
+                    resume: bool = False, deadline: Optional[float] = None,
+                    max_requests: Optional[int] = None) -> int:
+    """Stream the search results to an NDJSON file, or to stdout for '-'."""
+    concerts = finder.iter_concerts(incremental=incremental, resume=resume,
+                                    deadline=deadline, max_requests=max_requests)
+    if path == '-':
+        return write_ndjson(concerts, stdout)
+    with open(path, 'w') as f:
+        return write_ndjson(concerts, f)
+
+def write_metrics(metrics: MetricsRegistry, args):
+    """Write the run's request metrics to the files requested on the command line."""
+    if args.metrics_json:
+        with open(args.metrics_json, 'w') as f:
+            f.write(metrics.to_json())
+        print(f"Metrics written to {args.metrics_json}")
+    if args.metrics_prom:
+        with open(args.metrics_prom, 'w') as f:
+            f.write(metrics.to_prometheus())
+        print(f"Metrics written to {args.metrics_prom}")
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Find concerts by your Spotify artists during your travels.")
+    parser.add_argument('--offline', action='store_true',
+                        help="use only saved artists, calendar events and cached concert results")
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help="write per-API request metrics as JSON when the search ends")
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help="write per-API request metrics in Prometheus text format")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only search new artists and trips and pairs not searched recently, "
+                             "and list concerts not found before")
+    parser.add_argument('--ndjson', metavar='FILE',
+                        help="stream concerts as JSON lines while searching ('-' for stdout)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted search, skipping the searches it finished")
+    parser.add_argument('--plan', action='store_true',
+                        help="print the estimated concert API requests per API and exit without searching")
+    parser.add_argument('--deadline', type=float, metavar='SECONDS',
+                        help="stop searching after this many seconds and show what was found")
+    parser.add_argument('--max-requests', type=int, metavar='N',
+                        help="send at most N concert API requests")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.ndjson == '-':
+        # Messages go to stderr so stdout carries only the JSON lines
+        stdout = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            run_search(args, stdout)
+    else:
+        run_search(args, sys.stdout)
+
+def print_resume_hint():
+    """Point out --resume when an interrupted search left finished searches behind."""
+    if os.path.exists(DEFAULT_JOURNAL_PATH):
+        print("Finished searches were saved; run again with --resume to continue where it stopped.")
+
+def run_search(args, stdout: TextIO):
     try:
         print("\nWelcome to Concert Finder!")
-        finder = ConcertFinder()
+        finder = ConcertFinder(offline=args.offline)
         
         if not finder.enabled_apis:
             print("\nNo APIs were successfully enabled. Please check your configuration and try again.")
             return
             
-        concerts = finder.find_concerts()
+        if args.plan:
+            print()
+            print(format_plan(finder.plan_search(incremental=args.incremental)))
+            return
+            
+        if args.ndjson:
+            count = stream_concerts(finder, args.ndjson, stdout, args.incremental, args.resume,
+                                    args.deadline, args.max_requests)
+            write_metrics(finder.metrics, args)
+            print(f"\nTotal concerts found: {count}")
+            return
+            
+        concerts = finder.find_concerts(incremental=args.incremental, resume=args.resume,
+                                        deadline=args.deadline, max_requests=args.max_requests)
+        write_metrics(finder.metrics, args)
+        
+        if args.incremental:
+            # Scheduled runs report only what is new since the last run
+            concerts = finder.new_concerts
         
         if concerts:
-            print("\nFound concerts during your travels!")
+            print("\nFound new concerts since the last run!" if args.incremental
+                  else "\nFound concerts during your travels!")
             # Sort concerts by date
-            concerts.sort(key=lambda x: x['date'])
+            concerts.sort(key=lambda x: x.start)
             
             # Group concerts by location
-            from itertools import groupby
             by_location = {}
             
             for concert in concerts:
-                location = concert['venue'].split(' - ')[1]
-                if location not in by_location:
-                    by_location[location] = []
-                by_location[location].append(concert)
+                by_location.setdefault(concert.location, []).append(concert)
             
             # Print concerts grouped by location
             for location, location_concerts in by_location.items():
@@ -390,13 +913,17 @@ def main():
                 
             print(f"\nTotal concerts found: {len(concerts)}")
             print(f"Total locations: {len(by_location)}")
+        elif args.incremental:
+            print("\nNo new concerts since the last run.")
         else:
             print("\nNo matching concerts found for your favorite artists during your travels.")
             
     except KeyboardInterrupt:
         print("\n\nSearch cancelled by user.")
+        print_resume_hint()
     except Exception as e:
         print(f"\nAn error occurred: {e}")
+        print_resume_hint()
         print("\nIf you're seeing authentication errors, try:")
         print("1. Run 'python cleanup.py' to clear cached credentials")
         print("2. Run 'python setup_test.py' to verify your setup")
@@ -18,4 +18,43 @@ SEATGEEK_CLIENT_SECRET = "your_seatgeek_client_secret"
 BANDSINTOWN_APP_ID = "your_bandsintown_app_id"
 
 # Songkick API credentials
-SONGKICK_API_KEY = "your_songkick_api_key"
\ No newline at end of file
+SONGKICK_API_KEY = "your_songkick_api_key"
+
+# Search performance
+MAX_WORKERS = 8  # Parallel provider requests (1 = search one at a time)
+PROVIDER_CONCURRENCY = {  # Maximum parallel requests per concert API
+    'seatgeek': 4,
+    'bandsintown': 4,
+    'songkick': 4
+}
+SWEEP_SEARCH = True  # Fetch each city's event calendar once instead of once per artist
+TOUR_SEARCH = True   # Fetch each artist's tour once instead of once per trip
+ARTIST_REFRESH_HOURS = 24  # Reuse the saved Spotify artist list for this long
+RESCAN_HOURS = 24         # --incremental runs repeat a search once it is this old
+
+# Locations
+SEARCH_RADIUS_KM = 50  # Venues this far from a trip's city still count as in it
+# GAZETTEER_PATH = 'cities15000.txt'  # GeoNames cities file to resolve more places than the built-in list
+
+# Network settings
+HTTP_TIMEOUT = (5, 30)  # (connect, read) timeout in seconds
+HTTP_MAX_RETRIES = 3    # Retries for server errors, dropped connections and 429s
+
+# Requests per second allowed for each concert API. APIs without a limit are
+# only slowed down when they answer 429 Too Many Requests.
+RATE_LIMITS = {
+    # 'seatgeek': 10,
+    # 'bandsintown': 5,
+    # 'songkick': 5,
+}
+
+# Response cache
+CACHE_ENABLED = True
+CACHE_PATH = "concert_cache.db"
+CACHE_TTL = {  # Seconds before cached results are fetched again
+    'seatgeek': 6 * 60 * 60,
+    'bandsintown': 12 * 60 * 60,
+    'songkick': 12 * 60 * 60
+}
+CACHE_MEMORY_ENTRIES = 2048  # Responses kept in memory during a run
+CACHE_MAX_MB = 200           # Size limit of the on-disk cache
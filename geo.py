@@ -0,0 +1,247 @@
+import csv
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from areas import COUNTRIES_BY_NAME, COUNTRY_ALIASES, REGION_COUNTRIES, REGION_NAMES, REGIONS_BY_NAME, area_name
+from json_store import load_json, save_json_atomic
+from travel_periods import city_key
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+# Small built-in gazetteer of major cities; GAZETTEER_PATH can point to a
+# GeoNames cities file (e.g. cities15000.txt) for wider coverage
+BUILTIN_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.csv')
+DEFAULT_LOCATIONS_PATH = 'locations.json'
+DEFAULT_SEARCH_RADIUS_KM = 50
+# Bumped when resolution rules change, so remembered answers are worked out again
+RESOLVER_VERSION = 4
+
+def in_area(place, name: str) -> bool:
+    """Whether a place can be in the region or country name refers to.
+
+    Codes such as "CA" may mean a region or a country, and either will do.
+    A place without a region fits any region of its country, since GeoNames
+    only gives US places one.
+    """
+    region = (place.region or '').lower()
+    country = (place.country or '').lower()
+    if COUNTRIES_BY_NAME.get(name) == country:
+        return True
+    code = REGIONS_BY_NAME.get(name)
+    if code is None:
+        return False
+    return code == region or (not region and REGION_COUNTRIES.get(code, 'us') == country)
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def coordinates(latitude, longitude) -> Tuple[Optional[float], Optional[float]]:
+    """Parse provider coordinates, which may be numbers, strings or missing"""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+def near(period: Dict, concert, radius_km: float) -> bool:
+    """Whether a concert is in a travel period's area.
+
+    Within radius_km when both have coordinates, otherwise in the same city.
+    """
+    if period.get('latitude') is not None and concert.latitude is not None:
+        return haversine_km(period['latitude'], period['longitude'],
+                            concert.latitude, concert.longitude) <= radius_km
+    return city_key(concert.city) == (period.get('city') or city_key(period['location']))
+
+class Place:
+    """A gazetteer city"""
+
+    __slots__ = ('name', 'region', 'country', 'latitude', 'longitude', 'population')
+
+    def __init__(self, name: str, region: str, country: str, latitude: float, longitude: float,
+                 population: int = 0):
+        self.name = name
+        self.region = region or None
+        self.country = country or None
+        self.latitude = latitude
+        self.longitude = longitude
+        self.population = population
+
+    @property
+    def label(self) -> str:
+        """"City, Region, Country" text, which providers and city_key understand"""
+        return ', '.join(part for part in (self.name, self.region, self.country) if part)
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class Gazetteer:
+    """City names to places, for resolving free-text locations offline"""
+
+    def __init__(self, places: Iterable[Place] = ()):
+        self.by_name = {}
+        for place in places:
+            self.add(place)
+
+    def add(self, place: Place, *names: str):
+        for name in {city_key(place.name), *(city_key(name) for name in names)}:
+            if name:
+                self.by_name.setdefault(name, []).append(place)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'Gazetteer':
+        """Load the built-in CSV, or a GeoNames cities file if path ends in .txt"""
+        path = path or BUILTIN_GAZETTEER_PATH
+        gazetteer = cls()
+        with open(path, encoding='utf-8', newline='') as f:
+            if path.endswith('.txt'):
+                # GeoNames columns: name 1, ascii name 2, lat 4, lon 5, country 8, admin1 10, population 14
+                for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                    place = Place(row[1], row[10] if row[8] == 'US' else None, row[8],
+                                  float(row[4]), float(row[5]), int(row[14] or 0))
+                    gazetteer.add(place, row[2])
+            else:
+                for row in csv.DictReader(f):
+                    gazetteer.add(Place(row['name'], row['region'], row['country'],
+                                        float(row['latitude']), float(row['longitude']),
+                                        int(row['population'] or 0)))
+        return gazetteer
+
+    def resolve(self, text: str) -> Optional[Place]:
+        """Find the city a free-text location refers to.
+
+        Each comma-separated part is looked up, so "Hilton, 123 Main St,
+        Chicago, IL" finds Chicago. Later parts that name a region or country
+        rule out cities elsewhere: "Dublin, OH" is not Dublin, Ireland, and
+        resolves to None when the gazetteer has no Dublin in Ohio, and neither
+        does "Dublin, OH 43017" since trailing postal codes are ignored. Among the
+        rest, a candidate whose later parts name its region or country wins,
+        then the later part (addresses end with the city), then the larger
+        city. Without any comma match, a run of up to three words is accepted
+        only when a region or country follows it, as in "123 Main St Chicago
+        IL"; a venue such as "Denver Room, Hyatt Tulsa" names no city.
+        """
+        parts = [city_key(part) for part in text.split(',')]
+        parts = [part for part in parts if part]
+        names = [area_name(part) or part for part in parts]
+        areas = [name for name in map(area_name, parts[1:]) if name]
+        best = self._best_match((part, set(names[i + 1:]), areas) for i, part in enumerate(parts))
+        if best is None and parts:
+            words = ' '.join(parts).split()
+            best = self._best_match(
+                (' '.join(words[i:i + size]), {area}, areas + [area])
+                for size in (3, 2, 1) for i in range(len(words) - size + 1)
+                for area in [self._area_after(words[i + size:])] if area
+            )
+        return best
+
+    @staticmethod
+    def _area_after(words: List[str]) -> Optional[str]:
+        """The region or country the words start with, if any"""
+        for size in (3, 2, 1):
+            name = area_name(' '.join(words[:size])) if len(words) >= size else None
+            if name:
+                return name
+        return None
+
+    def _best_match(self, candidates: Iterable[Tuple[str, set, List[str]]]) -> Optional[Place]:
+        """Best place named by any (name, words around it, areas it must be in) candidate"""
+        best, best_score = None, None
+        for position, (name, context, areas) in enumerate(candidates):
+            for place in self.by_name.get(name, ()):
+                if not all(in_area(place, area) for area in areas):
+                    continue
+                country = (place.country or '').lower()
+                region = (place.region or '').lower()
+                hints = bool(context & {region, REGION_NAMES.get(region, region)}) + \
+                    bool(context & {country, *COUNTRY_ALIASES.get(country, ())})
+                score = (hints, position, place.population)
+                if best_score is None or score > best_score:
+                    best, best_score = place, score
+        return best
+
+class LocationResolver:
+    """Resolves calendar locations to places, remembering answers between runs.
+
+    The gazetteer is only loaded when a location hasn't been resolved before,
+    so repeat runs with the same calendar never read it.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_LOCATIONS_PATH, gazetteer_path: Optional[str] = None):
+        self.path = path
+        self.gazetteer_path = gazetteer_path
+        self._gazetteer = None
+        self._places = {}
+        self._changed = False
+        self.load()
+
+    @property
+    def source(self) -> str:
+        """Identifies the gazetteer, so answers from a different one are dropped"""
+        return f"{os.path.basename(self.gazetteer_path or BUILTIN_GAZETTEER_PATH)}:{RESOLVER_VERSION}"
+
+    def load(self):
+        data = load_json(self.path, 'location store')
+        if data is not None and data.get('source') == self.source:
+            self._places = data.get('places', {})
+
+    def save(self):
+        """Write new answers, if there are any"""
+        if not self.path or not self._changed:
+            return
+        save_json_atomic(self.path, {'source': self.source, 'places': self._places})
+        self._changed = False
+
+    def resolve(self, text: str) -> Optional[Place]:
+        key = ' '.join(text.split())
+        if key not in self._places:
+            if self._gazetteer is None:
+                self._gazetteer = Gazetteer.load(self.gazetteer_path)
+            place = self._gazetteer.resolve(key)
+            # Unknown locations are remembered too, so they aren't looked up every run
+            self._places[key] = place.as_dict() if place else None
+            self._changed = True
+        entry = self._places[key]
+        return Place(**entry) if entry else None
+
+class GeoIndex:
+    """Points bucketed into a grid of cells about cell_km across, for radius queries"""
+
+    def __init__(self, cell_km: float = DEFAULT_SEARCH_RADIUS_KM):
+        self.cell_deg = max(cell_km, 1) / KM_PER_DEGREE
+        self.lon_cells = math.ceil(360 / self.cell_deg)
+        self.cells = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor((latitude + 90) / self.cell_deg),
+                math.floor((longitude + 180) / self.cell_deg) % self.lon_cells)
+
+    def add(self, latitude: float, longitude: float, item):
+        self.cells.setdefault(self._cell(latitude, longitude), []).append((latitude, longitude, item))
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List:
+        """Items within radius_km of a point, nearest first"""
+        row, column = self._cell(latitude, longitude)
+        rows = math.ceil(radius_km / KM_PER_DEGREE / self.cell_deg)
+        # Degrees of longitude shrink towards the poles
+        shrink = max(math.cos(math.radians(latitude)), 0.01)
+        columns = min(math.ceil(radius_km / (KM_PER_DEGREE * shrink) / self.cell_deg), self.lon_cells // 2)
+
+        found = []
+        for r in range(row - rows, row + rows + 1):
+            for c in {(column + offset) % self.lon_cells for offset in range(-columns, columns + 1)}:
+                for lat, lon, item in self.cells.get((r, c), ()):
+                    distance = haversine_km(latitude, longitude, lat, lon)
+                    if distance <= radius_km:
+                        found.append((distance, item))
+        found.sort(key=lambda pair: pair[0])
+        return [item for _, item in found]
@@ -0,0 +1,21 @@
+import json
+import os
+from typing import Any, Optional
+
+def load_json(path: Optional[str], description: str) -> Any:
+    """Contents of a saved JSON file, or None if it is missing or unreadable"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable {description} {path}: {e}")
+        return None
+
+def save_json_atomic(path: str, data: Any):
+    """Write JSON through a temporary file, so an interrupted run can't leave a corrupt one"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,177 @@
+import json
+import math
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Upper bounds in seconds for the Prometheus latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class ProviderMetrics:
+    """Counters for one concert API provider"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0  # Requests that got no response at all
+        self.statuses = Counter()
+        self.bytes_received = 0
+        self.retries = 0
+        self.requeues = 0  # Searches put back in the queue after repeated 429s
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.revalidations = 0  # Conditional requests for expired cache entries
+        self.not_modified = 0  # Revalidations answered 304, renewing the entry
+        self.bytes_saved = 0  # Cached body bytes not downloaded again thanks to a 304
+        self.latencies = []
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'bytes_received': self.bytes_received,
+            'retries': self.retries,
+            'requeues': self.requeues,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hits / lookups if lookups else None,
+            'revalidations': self.revalidations,
+            'not_modified': self.not_modified,
+            'revalidation_rate': self.not_modified / self.revalidations if self.revalidations else None,
+            'bytes_saved': self.bytes_saved,
+            'latency_seconds': {
+                'mean': sum(latencies) / len(latencies) if latencies else None,
+                'p50': percentile(latencies, 0.50),
+                'p90': percentile(latencies, 0.90),
+                'p99': percentile(latencies, 0.99),
+                'max': latencies[-1] if latencies else None
+            }
+        }
+
+class MetricsRegistry:
+    """Thread-safe request metrics for every provider in a run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.providers = {}
+
+    def _provider(self, provider: str) -> ProviderMetrics:
+        if provider not in self.providers:
+            self.providers[provider] = ProviderMetrics()
+        return self.providers[provider]
+
+    def record_request(self, provider: str, latency: float, status: Optional[int] = None, size: int = 0):
+        """Record one HTTP attempt; status is None when no response arrived"""
+        with self._lock:
+            metrics = self._provider(provider)
+            metrics.requests += 1
+            metrics.latencies.append(latency)
+            metrics.bytes_received += size
+            if status is None:
+                metrics.errors += 1
+            else:
+                metrics.statuses[status] += 1
+
+    def record_retry(self, provider: str):
+        with self._lock:
+            self._provider(provider).retries += 1
+
+    def record_requeue(self, provider: str):
+        with self._lock:
+            self._provider(provider).requeues += 1
+
+    def record_cache(self, provider: str, hit: bool):
+        with self._lock:
+            metrics = self._provider(provider)
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def record_revalidation(self, provider: str, not_modified: bool, bytes_saved: int = 0):
+        """Record a conditional request and whether the cached response was still current"""
+        with self._lock:
+            metrics = self._provider(provider)
+            metrics.revalidations += 1
+            if not_modified:
+                metrics.not_modified += 1
+                metrics.bytes_saved += bytes_saved
+
+    def summary(self) -> Dict:
+        """Machine-readable summary keyed by provider"""
+        with self._lock:
+            return {provider: metrics.summary() for provider, metrics in sorted(self.providers.items())}
+
+    def to_json(self) -> str:
+        return json.dumps({'providers': self.summary()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Summary in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP concert_finder_{name} {help_text}")
+            lines.append(f"# TYPE concert_finder_{name} {kind}")
+
+        with self._lock:
+            providers = sorted(self.providers.items())
+
+            metric('requests_total', 'counter', 'HTTP responses received, by status code.')
+            for provider, m in providers:
+                for status, count in sorted(m.statuses.items()):
+                    lines.append(f'concert_finder_requests_total{{provider="{provider}",status="{status}"}} {count}')
+
+            for name, attribute, help_text in (
+                ('request_errors_total', 'errors', 'Requests that failed without a response.'),
+                ('retries_total', 'retries', 'Requests retried after a server error, connection error or 429.'),
+                ('requeues_total', 'requeues', 'Searches requeued after repeated 429 responses.'),
+                ('response_bytes_total', 'bytes_received', 'Response body bytes received.'),
+                ('cache_hits_total', 'cache_hits', 'Responses served from the cache.'),
+                ('cache_misses_total', 'cache_misses', 'Cache lookups that needed a request.'),
+                ('revalidations_total', 'revalidations', 'Conditional requests for expired cached responses.'),
+                ('not_modified_total', 'not_modified', 'Revalidations answered 304 Not Modified.'),
+                ('bytes_saved_total', 'bytes_saved', 'Cached response bytes not downloaded again after a 304.')
+            ):
+                metric(name, 'counter', help_text)
+                for provider, m in providers:
+                    lines.append(f'concert_finder_{name}{{provider="{provider}"}} {getattr(m, attribute)}')
+
+            metric('request_duration_seconds', 'histogram', 'HTTP request latency.')
+            for provider, m in providers:
+                for bound in LATENCY_BUCKETS:
+                    count = sum(1 for latency in m.latencies if latency <= bound)
+                    lines.append(f'concert_finder_request_duration_seconds_bucket{{provider="{provider}",le="{bound}"}} {count}')
+                lines.append(f'concert_finder_request_duration_seconds_bucket{{provider="{provider}",le="+Inf"}} {len(m.latencies)}')
+                lines.append(f'concert_finder_request_duration_seconds_sum{{provider="{provider}"}} {sum(m.latencies)}')
+                lines.append(f'concert_finder_request_duration_seconds_count{{provider="{provider}"}} {len(m.latencies)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def report(self) -> str:
+        """One human-readable line per provider"""
+        lines = []
+        for provider, summary in self.summary().items():
+            latency = summary['latency_seconds']
+            parts = [f"{summary['requests']} requests"]
+            if latency['p50'] is not None:
+                parts.append(f"p50 {latency['p50'] * 1000:.0f}ms, p90 {latency['p90'] * 1000:.0f}ms")
+            if summary['errors'] or summary['retries']:
+                parts.append(f"{summary['errors']} failed, {summary['retries']} retries")
+            if summary['requeues']:
+                parts.append(f"{summary['requeues']} requeued")
+            if summary['cache_hit_rate'] is not None:
+                parts.append(f"cache hit rate {summary['cache_hit_rate'] * 100:.0f}%")
+            if summary['revalidations']:
+                parts.append(f"{summary['revalidations']} revalidated "
+                             f"({summary['revalidation_rate'] * 100:.0f}% unchanged, {summary['bytes_saved']} bytes saved)")
+            lines.append(f"{provider}: {', '.join(parts)}")
+        return '\n'.join(lines)
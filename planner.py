@@ -0,0 +1,89 @@
+from typing import Callable, Dict, Iterable, List
+
+from search_engine import SearchJob, SweepJob, TourJob
+
+class SearchPlanner:
+    """Picks the cheapest query shape for each concert API.
+
+    APIs declare the shapes they support (supports_sweep, supports_tour) and
+    estimate the requests each one takes (search_cost, sweep_cost,
+    tour_cost). A city sweep replaces a trip's per-artist searches when it
+    takes fewer requests: a short trip with many artists is swept, while a
+    long trip to a busy city with a handful of artists is searched artist by
+    artist. A tour listing likewise replaces an artist's per-trip searches.
+    """
+
+    def __init__(self, sweep: bool = True, tour: bool = True):
+        self.sweep = sweep
+        self.tour = tour
+
+    def can_sweep(self, api) -> bool:
+        return self.sweep and api.supports_sweep
+
+    def can_tour(self, api) -> bool:
+        return self.tour and api.supports_tour and not self.can_sweep(api)
+
+    def period_jobs(self, api, period: Dict, wanted: List[str], sweep_artists) -> List[SearchJob]:
+        """Jobs searching one period for the wanted artists, as a sweep when that is cheaper.
+
+        sweep_artists are the artists a sweep matches; since it costs the same
+        for any number of artists, it can match more than just the wanted ones.
+        """
+        if not wanted:
+            return []
+        if self.can_sweep(api) and api.sweep_cost(period) <= len(wanted) * api.search_cost(period):
+            return [SweepJob(api, sweep_artists, period)]
+        return [SearchJob(api, artist, period) for artist in wanted]
+
+    def artist_jobs(self, api, artist: str, periods: List[Dict]) -> List[SearchJob]:
+        """Jobs searching one artist's periods, as a tour listing when that is cheaper"""
+        if not periods:
+            return []
+        if self.can_tour(api) and api.tour_cost(periods) <= sum(api.search_cost(period) for period in periods):
+            return [TourJob(api, artist, periods)]
+        return [SearchJob(api, artist, period) for period in periods]
+
+    def plan(self, apis: List, periods: List[Dict], artists_for: Callable[[object, Dict], List[str]],
+             sweep_artists_for: Callable[[Dict], Iterable[str]]) -> List[SearchJob]:
+        """Build the jobs for every API, nearest periods first.
+
+        artists_for(api, period) lists the artists still to search there, in
+        priority order, and sweep_artists_for(period) the artists a sweep of
+        that period matches. Tour listings, which span every period, come
+        after the period searches.
+        """
+        jobs = []
+        for period in periods:
+            for api in apis:
+                if not self.can_tour(api):
+                    jobs.extend(self.period_jobs(api, period, artists_for(api, period), sweep_artists_for(period)))
+
+        tour_apis = [api for api in apis if self.can_tour(api)]
+        if tour_apis:
+            periods_by_artist = {}
+            for period in periods:
+                for api in tour_apis:
+                    for artist in artists_for(api, period):
+                        periods_by_artist.setdefault((api, artist), []).append(period)
+            # In the order artists are first wanted: nearest trip, then priority
+            for (api, artist), artist_periods in periods_by_artist.items():
+                jobs.extend(self.artist_jobs(api, artist, artist_periods))
+        return jobs
+
+def estimate_requests(jobs: Iterable[SearchJob]) -> Dict[str, Dict]:
+    """Estimated requests and number of searches of each kind, per provider.
+
+    Requests several jobs share, like a Songkick city's metro area lookup,
+    are counted once.
+    """
+    estimates = {}
+    shared = {}
+    for job in jobs:
+        entry = estimates.setdefault(job.provider, {'requests': 0, 'searches': {}})
+        job_shared = job.shared_requests()
+        seen = shared.setdefault(job.provider, set())
+        entry['requests'] += job.estimated_requests() - len(job_shared & seen)
+        seen |= job_shared
+        kind = type(job).__name__
+        entry['searches'][kind] = entry['searches'].get(kind, 0) + 1
+    return estimates
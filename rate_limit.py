@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Pause after a 429 without a usable Retry-After, doubled for each one in a row
+DEFAULT_PAUSE = 1.0
+# Longest pause taken for a single 429, however long Retry-After asks for
+MAX_PAUSE = 60.0
+# A 429 halves the request rate, down to this fraction of the configured limit
+MIN_RATE_FRACTION = 0.1
+# Each successful request wins back this fraction of the configured limit
+RECOVERY_STEP = 0.05
+
+class Throttled(Exception):
+    """A provider kept answering 429 Too Many Requests"""
+
+    def __init__(self, provider: str, retry_after: Optional[float] = None):
+        super().__init__(f"{provider} is rate limiting requests")
+        self.provider = provider
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header holding seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class RateLimiter:
+    """Token bucket for one provider that slows down when the provider pushes back.
+
+    With a rate, requests are spaced to that many per second with bursts of up
+    to burst requests. A 429 pauses every request to the provider for the
+    Retry-After time and halves the rate; each success raises it back in small
+    steps toward the configured limit. Without a rate, requests are only
+    paused after a 429.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst or max(1.0, rate or 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._throttles_in_a_row = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """Record a 429 and return how long requests are paused for"""
+        with self._lock:
+            if retry_after is None:
+                retry_after = DEFAULT_PAUSE * (2 ** self._throttles_in_a_row)
+            pause = min(MAX_PAUSE, retry_after)
+            self._throttles_in_a_row += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            if self.rate is not None:
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+                self._tokens = 0
+            return pause
+
+    def succeeded(self):
+        """Record a request the provider accepted"""
+        with self._lock:
+            self._throttles_in_a_row = 0
+            if self.rate is not None and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
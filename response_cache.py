@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_PATH = 'concert_cache.db'
+DEFAULT_TTL = 6 * 60 * 60  # seconds
+DEFAULT_MEMORY_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# How many writes between checks of the on-disk size limit
+EVICTION_CHECK_INTERVAL = 100
+# Expired entries with an ETag or Last-Modified are kept this long after
+# expiring, so a refresh can ask the provider whether they changed
+REVALIDATION_WINDOW = 30 * 24 * 60 * 60  # seconds
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """Request headers asking the server to answer 304 if a cached response is still current"""
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a response has not been cached"""
+
+class ResponseCache:
+    """Two-tier cache for provider responses.
+
+    A bounded in-memory LRU sits in front of a persistent SQLite store.
+    Entries expire after a per-provider TTL, and the oldest entries on disk
+    are evicted once the store grows past its size limit. Entries stored
+    with the response's ETag or Last-Modified outlive their TTL for a while,
+    so an expired one can be revalidated with a conditional request and
+    renewed when the provider answers 304 Not Modified.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttls: Optional[Dict[str, int]] = None,
+                 default_ttl: int = DEFAULT_TTL,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {}
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+        # Caches created before validators were stored lack their columns
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(responses)')}
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE responses ADD COLUMN {column} TEXT')
+        self._db.commit()
+
+    @staticmethod
+    def make_key(provider: str, *parts) -> str:
+        """Build a normalized cache key from a provider and query parts"""
+        return '|'.join([provider] + [str(part).strip().casefold() for part in parts])
+
+    def ttl(self, provider: str) -> int:
+        return self.ttls.get(provider, self.default_ttl)
+
+    def get(self, provider: str, key: str, allow_expired: bool = False) -> Tuple[bool, Any]:
+        """Look up a key, returning (hit, value).
+
+        With allow_expired, entries past their TTL still count as hits.
+        """
+        now = 0 if allow_expired else time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._count(provider, 'memory_hits')
+                return True, entry[1]
+
+            row = self._db.execute(
+                'SELECT value, expires FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                self._count(provider, 'disk_hits')
+                return True, value
+
+            self._count(provider, 'misses')
+            return False, None
+
+    def validators(self, key: str) -> Optional[Tuple[Any, Optional[str], Optional[str], int]]:
+        """(value, etag, last_modified, size) of a stored entry that has validators, else None.
+
+        Expired entries count too; they are what conditional requests refresh.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, etag, last_modified, size FROM responses '
+                'WHERE key = ? AND (etag IS NOT NULL OR last_modified IS NOT NULL)', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2], row[3]
+
+    def set(self, provider: str, key: str, value: Any, ttl: Optional[int] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a JSON-serializable value for the provider's TTL, with its HTTP validators"""
+        expires = time.time() + (self.ttl(provider) if ttl is None else ttl)
+        data = json.dumps(value)
+        with self._lock:
+            self._remember(key, expires, value)
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, provider, value, size, expires, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, provider, data, len(data), expires, etag, last_modified)
+            )
+            self._db.commit()
+
+            self._writes += 1
+            if self._writes % EVICTION_CHECK_INTERVAL == 0:
+                self._evict()
+
+    def renew(self, provider: str, key: str, value: Any, ttl: Optional[int] = None):
+        """Start a new TTL for an entry the provider confirmed is unchanged"""
+        expires = time.time() + (self.ttl(provider) if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires, value)
+            self._db.execute('UPDATE responses SET expires = ? WHERE key = ?', (expires, key))
+            self._db.commit()
+
+    def _remember(self, key: str, expires: float, value: Any):
+        """Add an entry to the in-memory LRU, dropping the least recently used"""
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drop expired entries, then the soonest-expiring ones until under the size limit"""
+        now = time.time()
+        self._db.execute(
+            'DELETE FROM responses WHERE expires <= ? AND '
+            '(expires <= ? OR (etag IS NULL AND last_modified IS NULL))',
+            (now, now - REVALIDATION_WINDOW)
+        )
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            rows = self._db.execute('SELECT key, size FROM responses ORDER BY expires')
+            doomed = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            self._db.executemany('DELETE FROM responses WHERE key = ?', doomed)
+        self._db.commit()
+
+    def _count(self, provider: str, counter: str):
+        counters = self.stats.setdefault(provider, {'memory_hits': 0, 'disk_hits': 0, 'misses': 0})
+        counters[counter] += 1
+
+    def hit_rate(self, provider: Optional[str] = None) -> float:
+        """Fraction of lookups served from cache, overall or for one provider"""
+        counters = [self.stats.get(provider)] if provider else list(self.stats.values())
+        hits = sum(c['memory_hits'] + c['disk_hits'] for c in counters if c)
+        total = hits + sum(c['misses'] for c in counters if c)
+        return hits / total if total else 0.0
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
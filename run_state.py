@@ -0,0 +1,88 @@
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from artist_index import artist_key
+from json_store import load_json, save_json_atomic
+from travel_periods import period_day, place_key
+
+DEFAULT_STATE_PATH = 'run_state.json'
+DEFAULT_RESCAN_AGE = 24 * 60 * 60  # seconds
+
+def period_key(period: Dict) -> str:
+    """Stable identity of a travel period: its place and first and last day"""
+    place = period.get('place') or place_key(period['location'])
+    return f"{place}|{period_day(period['start'])}|{period_day(period['end'])}"
+
+def concert_id(concert) -> str:
+    return '|'.join(str(part) for part in concert.key)
+
+class RunState:
+    """What earlier runs searched and found, so scheduled runs can skip repeats.
+
+    searched maps provider -> period key -> artist key -> time the pair was
+    last searched. concerts maps each concert found to when it was first seen.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        self.searched = {}
+        self.concerts = {}
+        self.updated_at = None
+        self.load()
+
+    def load(self):
+        """Load the saved state, starting empty if there is none"""
+        data = load_json(self.path, 'run state')
+        if data is None:
+            return
+        self.searched = data.get('searched', {})
+        self.concerts = data.get('concerts', {})
+        self.updated_at = data.get('updated_at')
+
+    def save(self):
+        self.updated_at = time.time()
+        save_json_atomic(self.path, {'updated_at': self.updated_at, 'searched': self.searched,
+                                     'concerts': self.concerts})
+
+    def is_stale(self, provider: str, period: Dict, artist: str, max_age: float,
+                 now: Optional[float] = None) -> bool:
+        """Whether an (artist, period, provider) pair was never searched or not recently"""
+        searched_at = self.searched.get(provider, {}).get(period_key(period), {}).get(artist_key(artist))
+        if searched_at is None:
+            return True
+        return (now or time.time()) - searched_at > max_age
+
+    def record_job(self, job):
+        """Mark every (artist, period) pair a finished job covered as searched now"""
+        now = int(time.time())
+        by_period = self.searched.setdefault(job.provider, {})
+        for artist, period in job.pairs():
+            by_period.setdefault(period_key(period), {})[artist_key(artist)] = now
+
+    def add_concert(self, concert, since: Optional[float] = None) -> bool:
+        """Remember a concert, returning True the first time it is seen.
+
+        Concerts first seen at or after since also count, so a resumed run
+        still reports what its interrupted start found.
+        """
+        key = concert_id(concert)
+        first_seen = self.concerts.get(key)
+        if first_seen is None:
+            self.concerts[key] = int(time.time())
+            return True
+        return since is not None and first_seen >= int(since)
+
+    def prune(self, periods: Iterable[Dict], today: Optional[date] = None):
+        """Forget travel periods that no longer exist and concerts already past"""
+        current = {period_key(period) for period in periods}
+        for by_period in self.searched.values():
+            for key in list(by_period):
+                if key not in current:
+                    del by_period[key]
+
+        today = (today or date.today()).isoformat()
+        for key in list(self.concerts):
+            # The last part of a concert id is its local date
+            if key.rsplit('|', 1)[-1] < today:
+                del self.concerts[key]
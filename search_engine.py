@@ -0,0 +1,288 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from response_cache import CacheMiss
+from rate_limit import Throttled
+from budget import BudgetExhausted, SearchBudget
+from concert import Concert
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PROVIDER_CONCURRENCY = 4
+# Times a search is put back in the queue after its provider kept answering 429
+DEFAULT_MAX_REQUEUES = 3
+
+class SearchFailed(Exception):
+    """A search job gave up on an error, so it searched nothing"""
+
+class SearchJob:
+    """A single (artist, travel period, provider) search unit"""
+
+    def __init__(self, api, artist: str, period: Dict):
+        self.api = api
+        self.artist = artist
+        self.period = period
+        self.requeues = 0
+
+    @property
+    def provider(self) -> str:
+        return self.api.name
+
+    def pairs(self) -> Iterator[Tuple[str, Dict]]:
+        """The (artist, travel period) pairs this job searches"""
+        yield self.artist, self.period
+
+    def estimated_requests(self) -> float:
+        return self.api.search_cost(self.period)
+
+    def shared_requests(self) -> set:
+        """Requests in the estimate that other jobs may need too, made only once"""
+        return self.api.shared_requests(self.period)
+
+    def run(self) -> List[Concert]:
+        """Run the search; errors are raised as SearchFailed so one bad job can't stop the run"""
+        try:
+            return self._search()
+        except CacheMiss:
+            # Offline runs simply have no results for searches never made online
+            return []
+        except (Throttled, BudgetExhausted):
+            # The engine requeues or stops the job rather than dropping its results
+            raise
+        except Exception as e:
+            print(f"Error searching concerts with {self.api.__class__.__name__}: {e}")
+            # Not an empty result: the engine lists the job in failed
+            raise SearchFailed(str(e)) from e
+
+    def _search(self) -> List[Concert]:
+        return self.api.search_concerts(
+            self.artist,
+            self.period['location'],
+            self.period['start'],
+            self.period['end']
+        )
+
+class SweepJob(SearchJob):
+    """A (travel period, provider) unit matching every artist in one pass"""
+
+    def __init__(self, api, artists: Iterable[str], period: Dict):
+        super().__init__(api, None, period)
+        self.artists = artists
+
+    def pairs(self) -> Iterator[Tuple[str, Dict]]:
+        for artist in self.artists:
+            yield artist, self.period
+
+    def estimated_requests(self) -> float:
+        return self.api.sweep_cost(self.period)
+
+    def _search(self) -> List[Concert]:
+        return self.api.sweep_concerts(
+            self.artists,
+            self.period['location'],
+            self.period['start'],
+            self.period['end']
+        )
+
+class TourJob(SearchJob):
+    """An (artist, provider) unit covering every travel period with one tour listing"""
+
+    def __init__(self, api, artist: str, periods: List[Dict]):
+        super().__init__(api, artist, None)
+        self.periods = periods
+
+    def pairs(self) -> Iterator[Tuple[str, Dict]]:
+        for period in self.periods:
+            yield self.artist, period
+
+    def estimated_requests(self) -> float:
+        return self.api.tour_cost(self.periods)
+
+    def shared_requests(self) -> set:
+        return set().union(*(self.api.shared_requests(period) for period in self.periods))
+
+    def _search(self) -> List[Concert]:
+        return self.api.tour_concerts(self.artist, self.periods)
+
+class SearchEngine:
+    """Runs search jobs on a bounded worker pool with per-provider limits.
+
+    run() returns results in job order, so the output is identical to running
+    the same jobs one after another; iter_results() streams them as they finish.
+    Jobs whose provider is rate limiting go to the back of its queue, up to
+    max_requeues times; jobs that still fail, and jobs that fail on any
+    other error (a dropped connection, a 5xx after every retry), are listed
+    in failed and finish with no results.
+
+    Each provider's jobs start in list order, so jobs should be listed most
+    important first. With a budget, no job starts once it is used up, jobs
+    still running at the deadline are abandoned, and every job that didn't
+    finish is listed in unsearched.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 provider_limits: Optional[Dict[str, int]] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None,
+                 max_requeues: int = DEFAULT_MAX_REQUEUES,
+                 metrics=None, budget: Optional[SearchBudget] = None):
+        self.max_workers = max(1, max_workers)
+        self.provider_limits = provider_limits or {}
+        self.on_progress = on_progress
+        self.max_requeues = max_requeues
+        self.metrics = metrics
+        self.budget = budget
+        self.failed = []
+        self.unsearched = []
+
+    def provider_limit(self, provider: str) -> int:
+        """Maximum number of concurrent requests for a provider"""
+        return max(1, self.provider_limits.get(provider, DEFAULT_PROVIDER_CONCURRENCY))
+
+    def run(self, jobs: List[SearchJob]) -> List[List[Concert]]:
+        """Run all jobs and return their results in job order"""
+        results = [[] for _ in jobs]
+        for index, result in self.iter_results(jobs):
+            results[index] = result
+        return results
+
+    def iter_results(self, jobs: List[SearchJob], ordered: bool = False,
+                     on_finished: Optional[Callable[[int, List[Concert]], None]] = None
+                     ) -> Iterator[Tuple[int, List[Concert]]]:
+        """Yield (job index, results) pairs as jobs finish.
+
+        With ordered set, results are held back until every earlier job has
+        finished, so they come out in job order. on_finished, if given, sees
+        each job's results as soon as it finishes, even while they are held back.
+        """
+        self.failed = []
+        self.unsearched = []
+        if self.max_workers == 1:
+            finished = self._iter_sequential(jobs)
+        else:
+            finished = self._iter_concurrent(jobs)
+        if on_finished is not None:
+            finished = self._notify(finished, on_finished)
+
+        if not ordered:
+            yield from finished
+            return
+
+        waiting = {}
+        next_index = 0
+        for index, result in finished:
+            waiting[index] = result
+            while next_index in waiting:
+                yield next_index, waiting.pop(next_index)
+                next_index += 1
+        # Jobs stopped by the budget leave gaps; release what finished after them
+        for index in sorted(waiting):
+            yield index, waiting[index]
+
+    @staticmethod
+    def _notify(finished, on_finished):
+        for index, result in finished:
+            on_finished(index, result)
+            yield index, result
+
+    def _report(self, completed: int, total: int):
+        if self.on_progress:
+            self.on_progress(completed, total)
+
+    def _requeue(self, job: SearchJob) -> bool:
+        """Count a throttled run of a job; False once it has used up its requeues"""
+        if job.requeues >= self.max_requeues:
+            self.failed.append(job)
+            return False
+        job.requeues += 1
+        if self.metrics is not None:
+            self.metrics.record_requeue(job.provider)
+        return True
+
+    def _out_of_budget(self) -> bool:
+        return self.budget is not None and self.budget.exhausted
+
+    def _iter_sequential(self, jobs: List[SearchJob]):
+        queue = deque(range(len(jobs)))
+        completed = 0
+        while queue:
+            if self._out_of_budget():
+                self.unsearched.extend(jobs[index] for index in queue)
+                return
+            index = queue.popleft()
+            try:
+                result = jobs[index].run()
+            except BudgetExhausted:
+                queue.appendleft(index)
+                continue
+            except Throttled:
+                if self._requeue(jobs[index]):
+                    queue.append(index)
+                    continue
+                result = []
+            except SearchFailed:
+                self.failed.append(jobs[index])
+                result = []
+            completed += 1
+            self._report(completed, len(jobs))
+            yield index, result
+
+    def _iter_concurrent(self, jobs: List[SearchJob]):
+        # One FIFO queue per provider so a slow provider can't starve the others
+        pending = {}
+        for index, job in enumerate(jobs):
+            pending.setdefault(job.provider, deque()).append(index)
+        in_flight = {provider: 0 for provider in pending}
+        futures = {}
+        completed = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while futures or any(pending.values()):
+                if self._out_of_budget():
+                    if not futures or self.budget.out_of_time:
+                        # Past the deadline, searches still running are abandoned
+                        self.unsearched.extend(jobs[index] for index in futures.values())
+                        for queue in pending.values():
+                            self.unsearched.extend(jobs[index] for index in queue)
+                        return
+                else:
+                    self._fill(pool, jobs, pending, in_flight, futures)
+                timeout = self.budget.time_left() if self.budget is not None else None
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = futures.pop(future)
+                    provider = jobs[index].provider
+                    in_flight[provider] -= 1
+                    try:
+                        result = future.result()
+                    except BudgetExhausted:
+                        pending[provider].appendleft(index)
+                        continue
+                    except Throttled:
+                        if self._requeue(jobs[index]):
+                            pending[provider].append(index)
+                            continue
+                        result = []
+                    except SearchFailed:
+                        self.failed.append(jobs[index])
+                        result = []
+                    completed += 1
+                    self._report(completed, len(jobs))
+                    yield index, result
+        finally:
+            # Also reached when the consumer stops early or is interrupted
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fill(self, pool, jobs, pending, in_flight, futures):
+        """Submit jobs round-robin across providers until every limit is reached"""
+        submitted = True
+        while submitted and len(futures) < self.max_workers:
+            submitted = False
+            for provider, queue in pending.items():
+                if len(futures) >= self.max_workers:
+                    break
+                if queue and in_flight[provider] < self.provider_limit(provider):
+                    index = queue.popleft()
+                    futures[pool.submit(jobs[index].run)] = index
+                    in_flight[provider] += 1
+                    submitted = True
@@ -0,0 +1,54 @@
+import pytest
+
+from geo import Gazetteer, Place, in_area
+
+@pytest.fixture(scope='module')
+def gazetteer():
+    return Gazetteer.load()
+
+@pytest.mark.parametrize('text, label', [
+    ("Chicago, IL", "Chicago, IL, US"),
+    ("Hilton, 123 Main St, Chicago, IL", "Chicago, IL, US"),
+    ("London, Ontario", "London, ON, CA"),
+    ("London, UK", "London, GB"),
+    ("Paris, France", "Paris, FR"),
+    ("Paris, TX", "Paris, TX, US"),
+    ("Portland, Maine, USA", "Portland, ME, US"),
+    ("Brooklyn, New York", "Brooklyn, NY, US"),
+    ("Toronto, CA", "Toronto, ON, CA"),
+    ("Chicago, IL 60601", "Chicago, IL, US"),
+    ("123 Main St Chicago IL", "Chicago, IL, US"),
+])
+def test_resolves_cities_in_the_named_area(gazetteer, text, label):
+    assert gazetteer.resolve(text).label == label
+
+@pytest.mark.parametrize('text', [
+    "Manchester, NH",
+    "Dublin, OH",
+    "Dublin, OH 43017",
+    "Manchester, NH 03101",
+    "Melbourne, FL",
+    "Vancouver, WA",
+    "San Jose, Costa Rica",
+])
+def test_same_named_city_in_another_area_is_not_a_match(gazetteer, text):
+    assert gazetteer.resolve(text) is None
+
+@pytest.mark.parametrize('text', [
+    "Denver Room, Hyatt Tulsa",
+    "Boston Market, Tulsa",
+    "Washington Square Park",
+])
+def test_city_names_inside_venue_names_are_not_a_match(gazetteer, text):
+    assert gazetteer.resolve(text) is None
+
+def test_unqualified_names_pick_the_larger_city(gazetteer):
+    assert gazetteer.resolve("Paris").label == "Paris, FR"
+    assert gazetteer.resolve("Dublin").label == "Dublin, IE"
+
+def test_places_without_a_region_fit_any_region_of_their_country():
+    # GeoNames only gives US places a region
+    toronto = Place("Toronto", None, "CA", 43.65, -79.38)
+    assert in_area(toronto, 'on')
+    assert in_area(toronto, 'canada')
+    assert not in_area(toronto, 'nh')
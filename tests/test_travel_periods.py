@@ -0,0 +1,71 @@
+from run_state import period_key
+from travel_periods import city_key, coalesce_periods, place_key, same_place
+
+def trip(location, start, end):
+    return {'location': location, 'start': start, 'end': end}
+
+def test_city_key_ignores_region_case_and_accents():
+    assert city_key(" Montréal , QC") == city_key("MONTREAL") == "montreal"
+
+def test_place_key_keeps_region_and_country():
+    assert place_key("Portland, OR, US") == place_key(" portland,or , US ") == "portland|or|us"
+    assert place_key("Portland, OR, US") != place_key("Portland, ME, US")
+
+def test_adjacent_trips_to_the_same_place_merge():
+    periods = coalesce_periods([
+        trip("Portland, OR, US", "2026-06-01", "2026-06-02"),
+        trip("Portland, OR, US", "2026-06-03", "2026-06-05")
+    ])
+    assert len(periods) == 1
+    assert (periods[0]['start'], periods[0]['end']) == ("2026-06-01", "2026-06-05")
+    assert periods[0]['city'] == "portland"
+
+def test_adjacent_trips_to_same_named_cities_stay_apart():
+    periods = coalesce_periods([
+        trip("Portland, ME, US", "2026-06-01", "2026-06-02"),
+        trip("Portland, OR, US", "2026-06-03", "2026-06-05")
+    ])
+    assert [period['location'] for period in periods] == ["Portland, ME, US", "Portland, OR, US"]
+    assert period_key(periods[0]) != period_key(periods[1])
+
+def test_only_trips_to_the_home_place_are_dropped():
+    events = [
+        trip("London, GB", "2026-06-01", "2026-06-03"),
+        trip("London, ON, CA", "2026-07-01", "2026-07-03")
+    ]
+    periods = coalesce_periods(events, home_location="London, ON, CA")
+    assert [period['location'] for period in periods] == ["London, GB"]
+
+def test_spellings_of_an_unresolved_home_are_all_dropped():
+    events = [
+        trip("Boise", "2026-06-01", "2026-06-02"),
+        trip("Boise, Idaho", "2026-06-10", "2026-06-11"),
+        trip("Boise, ID, USA", "2026-06-20", "2026-06-21"),
+        trip("Boise, ID 83702", "2026-06-25", "2026-06-26"),
+        trip("Tulsa, OK", "2026-07-01", "2026-07-02")
+    ]
+    periods = coalesce_periods(events, home_location="Boise, ID, USA")
+    assert [period['location'] for period in periods] == ["Tulsa, OK"]
+
+def test_trips_without_a_region_merge_with_the_only_named_place():
+    periods = coalesce_periods([
+        trip("Tulsa, OK", "2026-06-01", "2026-06-02"),
+        trip("Tulsa", "2026-06-03", "2026-06-04")
+    ])
+    assert len(periods) == 1
+    assert (periods[0]['start'], periods[0]['end']) == ("2026-06-01", "2026-06-04")
+
+def test_trips_without_a_region_stay_apart_when_several_places_share_the_name():
+    periods = coalesce_periods([
+        trip("Portland, OR", "2026-06-01", "2026-06-02"),
+        trip("Portland, ME", "2026-06-03", "2026-06-04"),
+        trip("Portland", "2026-06-05", "2026-06-06")
+    ])
+    assert len(periods) == 3
+    assert len({period_key(period) for period in periods}) == 3
+
+def test_same_place_compares_areas_only_when_both_name_one():
+    assert same_place("Boise", "Boise, ID, USA")
+    assert same_place("Toronto, ON, CA", "Toronto, Canada")
+    assert not same_place("Portland, OR", "Portland, ME")
+    assert not same_place("Boise, ID", "Boston, MA")
@@ -0,0 +1,137 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+
+from areas import area_name, area_options, combine_areas
+
+# Periods in the same city this close together are treated as one trip.
+# Providers search by whole days, so merging touching days adds no extra days.
+ADJACENT_GAP = timedelta(days=1)
+
+def _fold(text: str) -> str:
+    """Casefold and drop accents and punctuation"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', ' ', text.casefold())
+    return ' '.join(text.split())
+
+def city_key(location: str) -> str:
+    """Canonical key for the city part of a free-text location.
+
+    "Chicago, IL", " chicago,USA" and "CHICAGO" all map to "chicago".
+    """
+    return _fold(location.split(',')[0])
+
+def place_key(location: str) -> str:
+    """Canonical key for a whole location: its city, region and country.
+
+    "Portland, OR, US" and "Portland, ME, US" get different keys, while
+    "Portland, OR, US" and "portland , or,US" share one. Locations resolved
+    by the gazetteer all read "City, Region, Country", so the same place
+    always gets the same key.
+    """
+    parts = [_fold(part) for part in location.split(',')]
+    return '|'.join(part for part in parts if part)
+
+def location_areas(location: str) -> Optional[Set]:
+    """Possible (region, country) codes of a location, or None if it names neither"""
+    names = [area_name(_fold(part)) for part in location.split(',')[1:]]
+    return area_options(name for name in names if name)
+
+def same_place(location: str, other: str) -> bool:
+    """Whether two locations can be the same place.
+
+    They must name the same city, and if both name a region or country,
+    the same one: "Boise", "Boise, Idaho" and "Boise, ID, USA" are one
+    place, "Portland, OR" and "Portland, ME" are not.
+    """
+    if city_key(location) != city_key(other):
+        return False
+    areas, other_areas = location_areas(location), location_areas(other)
+    return areas is None or other_areas is None or bool(combine_areas(areas, other_areas))
+
+def period_day(value: str) -> date:
+    """Local calendar day of a Google Calendar date or dateTime string"""
+    return date.fromisoformat(value[:10])
+
+def period_days(period: Dict) -> int:
+    """Number of calendar days a period touches"""
+    return (period_day(period['end']) - period_day(period['start'])).days + 1
+
+def _group_by_place(city: str, periods: List[Dict]) -> Dict[str, List[Dict]]:
+    """Split periods in one city by the region or country they name.
+
+    Periods naming none join the only place named, if there is just one;
+    with several they can't be told apart and form a group of their own.
+    Groups are keyed by the place_key of a member that names its area.
+    """
+    named, unnamed = [], []
+    for period in periods:
+        areas = location_areas(period['location'])
+        if areas is None:
+            unnamed.append(period)
+            continue
+        for group_areas, group in named:
+            if combine_areas(areas, group_areas):
+                group.append(period)
+                break
+        else:
+            named.append((areas, [period]))
+
+    groups = [group for _, group in named]
+    if len(groups) == 1:
+        groups[0].extend(unnamed)
+    elif unnamed:
+        groups.append(unnamed)
+    return {
+        min((place_key(p['location']) for p in group if location_areas(p['location']) is not None),
+            default=city): group
+        for group in groups
+    }
+
+def coalesce_periods(periods: List[Dict], home_location: Optional[str] = None) -> List[Dict]:
+    """Drop trips home and merge overlapping or adjacent periods in the same place.
+
+    Places are compared with same_place, so a trip to Portland, OR is neither
+    merged with one to Portland, ME nor dropped for a home in Portland, ME,
+    while "Boise" and "Boise, Idaho" are one place. Each result keeps the
+    location text (and coordinates, if known) of its earliest member plus
+    'city' and 'place' keys, and spans the earliest start and latest end of
+    the merged periods.
+    """
+    by_city = {}
+    for period in periods:
+        city = city_key(period['location'])
+        if not city or (home_location and same_place(period['location'], home_location)):
+            continue
+        by_city.setdefault(city, []).append(period)
+
+    by_place = {}
+    for city, city_periods in by_city.items():
+        by_place.update(_group_by_place(city, city_periods))
+
+    merged = []
+    for key, place_periods in by_place.items():
+        place_periods.sort(key=lambda p: (period_day(p['start']), period_day(p['end'])))
+
+        current = None
+        for period in place_periods:
+            if current and period_day(period['start']) <= period_day(current['end']) + ADJACENT_GAP:
+                if period_day(period['end']) > period_day(current['end']):
+                    current['end'] = period['end']
+            else:
+                current = {
+                    'location': period['location'],
+                    'city': city_key(period['location']),
+                    'place': key,
+                    'start': period['start'],
+                    'end': period['end']
+                }
+                if period.get('latitude') is not None:
+                    current['latitude'] = period['latitude']
+                    current['longitude'] = period['longitude']
+                merged.append(current)
+
+    merged.sort(key=lambda p: (period_day(p['start']), p['place']))
+    return merged